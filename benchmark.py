@@ -0,0 +1,265 @@
+# Reproducible benchmarks for data generation, preprocessing, training and inference
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestRegressor
+
+import custom_dataset
+from dataset_io import read_dataset, training_columns
+from fast_preprocessor import FastPreprocessor
+from predictor import load_artifacts, feature_columns, model_path, preprocessor_path
+
+# Run fn `repeat` times and return the timings in seconds
+def time_runs(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def result(stage, variant, rows, timings):
+    median = statistics.median(timings)
+    return {
+        "stage": stage,
+        "variant": variant,
+        "rows": rows,
+        "seconds": median,
+        "min_seconds": min(timings),
+        "rows_per_sec": rows / median if median > 0 else None,
+        "runs": len(timings),
+    }
+
+def generate_frame(rows, seed, names="pool"):
+    rng = np.random.default_rng(seed)
+    if names == "pool":
+        name_source = custom_dataset.pool_names(custom_dataset.load_name_pool())
+    else:
+        name_source = custom_dataset.faker_names(custom_dataset.fake)
+    chunks = custom_dataset.iter_records(rows, rng, 1_000_000, names=name_source)
+    return pd.concat([df for df, _ in chunks], ignore_index=True)
+
+def bench_generation(rows, seed, repeat, max_faker_rows):
+    results = [result("generate", "names=pool", rows, time_runs(lambda: generate_frame(rows, seed), repeat))]
+    # Faker runs at ~10 us per name, skip it where it would dominate the whole suite
+    if rows <= max_faker_rows:
+        results.append(result("generate", "names=faker", rows,
+                              time_runs(lambda: generate_frame(rows, seed, "faker"), repeat)))
+    return results
+
+# The notebook's full read_csv against typed, projected loads of the same rows as CSV and Parquet
+def bench_loading(df, repeat, folder):
+    paths = {}
+    for file_format in ("csv", "parquet"):
+        paths[file_format] = os.path.join(folder, f"load.{file_format}")
+        custom_dataset.write_chunks([(df, 0)], paths[file_format], file_format)
+
+    results = []
+    for variant, path, load in (("csv_read_csv", paths["csv"], lambda: pd.read_csv(paths["csv"])),
+                                ("csv_typed", paths["csv"], lambda: read_dataset(paths["csv"], training_columns)),
+                                ("parquet_typed", paths["parquet"],
+                                 lambda: read_dataset(paths["parquet"], training_columns))):
+        entry = result("load", variant, len(df), time_runs(load, repeat))
+        entry["file_bytes"] = os.path.getsize(path)
+        results.append(entry)
+    return results
+
+def bench_preprocessing(df, preprocessor, repeat):
+    X = df[feature_columns]
+    results = [result("preprocess", "sklearn", len(df), time_runs(lambda: preprocessor.transform(X), repeat))]
+    for output in ("dense", "csr", "ordinal"):
+        fast = FastPreprocessor.from_column_transformer(preprocessor, output)
+        results.append(result("preprocess", output, len(df), time_runs(lambda: fast.transform(X), repeat)))
+    return results
+
+def bench_training(df, preprocessor, repeat, seed):
+    X = preprocessor.transform(df[feature_columns])
+    y = df["Salary"].to_numpy()
+    model = RandomForestRegressor(random_state=seed)  # Same defaults as the notebook
+    return result("train", "random_forest", len(df), time_runs(lambda: model.fit(X, y), repeat)), model
+
+def bench_batch_inference(df, model, preprocessor, repeat):
+    fast = FastPreprocessor.from_column_transformer(preprocessor, "csr")
+    X = fast.transform(df[feature_columns])
+    return [
+        result("predict_batch", "model_only", len(df), time_runs(lambda: model.predict(X), repeat)),
+        result("predict_batch", "csr_end_to_end", len(df),
+               time_runs(lambda: model.predict(fast.transform(df[feature_columns])), repeat)),
+    ]
+
+# Time the vectorized salary formula and measure the model against the noise-free target: the
+# oracle's own error on the observed salaries is the noise floor no model can beat
+def bench_oracle(df, model, preprocessor, repeat):
+    entry = result("oracle", "salary_formula", len(df), time_runs(lambda: custom_dataset.oracle_salary(df), repeat))
+    fast = FastPreprocessor.from_column_transformer(preprocessor, "csr")
+    predicted = model.predict(fast.transform(df[feature_columns]))
+    observed = df["Salary"].to_numpy()
+    target = custom_dataset.oracle_salary(df)
+
+    def rmse(a, b):
+        return float(np.sqrt(np.mean((a - b) ** 2)))
+    entry["model_rmse_observed"] = rmse(predicted, observed)
+    entry["model_rmse_noise_free"] = rmse(predicted, target)
+    entry["noise_floor_rmse"] = rmse(target, observed)
+    return [entry]
+
+# One row at a time the way the app does it: build a DataFrame, transform, predict
+def bench_single_inference(df, model, preprocessor, iterations):
+    results = []
+    profiles = df[feature_columns].head(iterations).to_dict("records")
+    fast = FastPreprocessor.from_column_transformer(preprocessor, "csr")
+
+    for variant, transformer in (("sklearn", preprocessor), ("csr", fast)):
+        timings = []
+        for profile in profiles:
+            start = time.perf_counter()
+            model.predict(transformer.transform(pd.DataFrame([profile])))
+            timings.append(time.perf_counter() - start)
+        entry = result("predict_single", variant, 1, timings)
+        entry["p99_seconds"] = float(np.percentile(timings, 99))
+        results.append(entry)
+    return results
+
+# Cold start in fresh interpreters: what the app needs before it can draw the form, and the
+# model load it now runs in the background
+def bench_startup(repeat, model_file, preprocessor_file):
+    snippets = {
+        "form_imports": "import predictor",
+        "model_ready": ("from predictor import load_artifacts; "
+                        f"load_artifacts({model_file!r}, {preprocessor_file!r}, 'csr')"),
+    }
+    return [result("startup", variant, 1,
+                   time_runs(lambda: subprocess.run([sys.executable, "-c", code], check=True,
+                                                    cwd=os.path.dirname(os.path.abspath(__file__))), repeat))
+            for variant, code in snippets.items()]
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scikit-learn": sklearn.__version__,
+    }
+
+# Compare against an earlier results file; returns the entries that got slower than tolerance allows
+def compare(results, baseline, tolerance):
+    previous = {(entry["stage"], entry["variant"], entry["rows"]): entry for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        old = previous.get((entry["stage"], entry["variant"], entry["rows"]))
+        if old is None or not old["seconds"]:
+            continue
+        ratio = entry["seconds"] / old["seconds"]
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"{entry['stage']:<15} {entry['variant']:<15} {entry['rows']:>10} "
+              f"{old['seconds']:>10.4f}s -> {entry['seconds']:>10.4f}s  x{ratio:.2f} {flag}")
+        if flag:
+            regressions.append(entry)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generation, preprocessing, training and inference")
+    parser.add_argument("--sizes", default="10000,1000000,10000000",
+                        help="comma-separated row counts for generation, preprocessing and batch inference")
+    parser.add_argument("--train-sizes", default="10000",
+                        help="comma-separated row counts for training (a 100-tree forest is slow on big data)")
+    parser.add_argument("--stages",
+                        default="startup,generate,load,preprocess,train,predict_batch,oracle,predict_single",
+                        help="comma-separated stages to run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (the median is reported)")
+    parser.add_argument("--single-iterations", type=int, default=200, help="rows scored one at a time")
+    parser.add_argument("--max-faker-rows", type=int, default=1_000_000,
+                        help="largest size also generated with per-row Faker names")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file")
+    parser.add_argument("--compare", default=None, help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown before --compare reports a regression (0.2 = 20%%)")
+    parser.add_argument("--model", default=model_path, help="pickled model (trained on the fly if missing)")
+    parser.add_argument("--preprocessor", default=preprocessor_path, help="pickled preprocessor")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    train_sizes = [int(size) for size in args.train_sizes.split(",")]
+    stages = set(args.stages.split(","))
+
+    if os.path.exists(args.model):
+        model, preprocessor = load_artifacts(args.model, args.preprocessor)
+    else:
+        model, preprocessor = None, joblib.load(args.preprocessor)
+
+    results = []
+    def record(entries):
+        for entry in entries:
+            print(f"{entry['stage']:<15} {entry['variant']:<15} {entry['rows']:>10} rows  "
+                  f"{entry['seconds']:.4f}s", flush=True)
+        results.extend(entries)
+
+    if "startup" in stages and os.path.exists(args.model):
+        record(bench_startup(args.repeat, os.path.abspath(args.model), os.path.abspath(args.preprocessor)))
+
+    for rows in train_sizes:
+        if "train" in stages or model is None:
+            entry, trained = bench_training(generate_frame(rows, args.seed), preprocessor, args.repeat, args.seed)
+            record([entry])
+            if model is None:
+                model = trained
+
+    for rows in sizes:
+        if "generate" in stages:
+            record(bench_generation(rows, args.seed, args.repeat, args.max_faker_rows))
+        if stages & {"load", "preprocess", "predict_batch", "oracle"}:
+            df = generate_frame(rows, args.seed)
+            if "load" in stages:
+                with tempfile.TemporaryDirectory() as folder:
+                    record(bench_loading(df, args.repeat, folder))
+            if "preprocess" in stages:
+                record(bench_preprocessing(df, preprocessor, args.repeat))
+            if "predict_batch" in stages:
+                record(bench_batch_inference(df, model, preprocessor, args.repeat))
+            if "oracle" in stages:
+                entries = bench_oracle(df, model, preprocessor, args.repeat)
+                record(entries)
+                print(f"{'':<15} model RMSE {entries[0]['model_rmse_observed']:.3f} vs observed, "
+                      f"{entries[0]['model_rmse_noise_free']:.3f} vs noise-free target "
+                      f"(noise floor {entries[0]['noise_floor_rmse']:.3f})")
+            del df
+
+    if "predict_single" in stages:
+        df = generate_frame(args.single_iterations, args.seed)
+        record(bench_single_inference(df, model, preprocessor, args.single_iterations))
+
+    report = {"environment": environment(), "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to '{args.output}'")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with '{args.compare}' (commit {baseline['environment'].get('commit')}):")
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# Precomputed lookup table of model predictions over the app's finite input space
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from predictor import (artifact_hash, load_artifacts, predict_frame, feature_columns, feature_options,
+                       feature_ranges, model_path, preprocessor_path)
+
+compiled_path = "model/salary_lookup.npz"
+
+# Number of possible values of each feature, in feature_columns order
+def feature_radices():
+    return np.array([len(feature_options[column]) if column in feature_options
+                     else feature_ranges[column][1] - feature_ranges[column][0] + 1
+                     for column in feature_columns], dtype=np.int64)
+
+# Mixed-radix key of every row (-1 for values outside the app's choices)
+def encode_keys(df):
+    radices = feature_radices()
+    keys = np.zeros(len(df), dtype=np.int64)
+    valid = np.ones(len(df), dtype=bool)
+
+    for column, radix in zip(feature_columns, radices):
+        if column in feature_options:
+            codes = pd.Categorical(df[column], categories=feature_options[column]).codes.astype(np.int64)
+        else:
+            codes = df[column].to_numpy(dtype=np.int64) - feature_ranges[column][0]
+        valid &= (codes >= 0) & (codes < radix)
+        keys = keys * radix + codes
+
+    return np.where(valid, keys, -1)
+
+# Same key for a single profile dict, without building a DataFrame
+def encode_key(profile):
+    key = 0
+    for column in feature_columns:
+        value = profile[column]
+        if column in feature_options:
+            options = feature_options[column]
+            if value not in options:
+                return -1
+            key = key * len(options) + options.index(value)
+        else:
+            low, high = feature_ranges[column]
+            if not low <= value <= high:
+                return -1
+            key = key * (high - low + 1) + int(value) - low
+    return key
+
+# Predicts from the table and falls back to the real model for profiles it doesn't cover.
+# `source` is the artifact_hash of the model and preprocessor files the values were computed with.
+class CompiledPredictor:
+    def __init__(self, keys, values, model=None, preprocessor=None, source=""):
+        order = np.argsort(keys)
+        self.keys = keys[order]
+        self.values = values[order]
+        self.model = model
+        self.preprocessor = preprocessor
+        self.source = source
+        self.hits = 0
+        self.misses = 0
+
+    # With `source`, refuse a table computed by other artifacts (e.g. before a retrain). It may be a
+    # function returning the hash, so the artifacts are only hashed when a table with a hash exists.
+    @classmethod
+    def load(cls, path=compiled_path, model=None, preprocessor=None, source=None):
+        with np.load(path) as data:
+            if not np.array_equal(data["radices"], feature_radices()):
+                raise ValueError(f"{path} was compiled for a different feature schema, rebuild it")
+            table_source = str(data["source"]) if "source" in data.files else ""
+            if source is not None and not table_source:
+                raise ValueError(f"{path} does not record the model it was compiled from, rebuild it")
+            if callable(source):
+                source = source()
+            if source is not None and table_source != source:
+                raise ValueError(f"{path} was compiled from a different model, rebuild it")
+            return cls(data["keys"], data["values"], model, preprocessor, table_source)
+
+    def save(self, path=compiled_path):
+        np.savez(path, keys=self.keys, values=self.values, radices=feature_radices(), source=np.array(self.source))
+
+    def __len__(self):
+        return len(self.keys)
+
+    # Table value for one profile dict, or None if it isn't in the table
+    def lookup(self, profile):
+        key = encode_key(profile)
+        index = self.keys.searchsorted(key)
+        if key >= 0 and index < len(self.keys) and self.keys[index] == key:
+            self.hits += 1
+            return float(self.values[index])
+        self.misses += 1
+        return None
+
+    def predict_one(self, profile):
+        salary = self.lookup(profile)
+        if salary is None:
+            salary = self._fallback(pd.DataFrame([profile]))[0]
+        return salary
+
+    def predict_frame(self, df):
+        keys = encode_keys(df)
+        index = np.minimum(self.keys.searchsorted(keys), max(len(self.keys) - 1, 0))
+        found = (keys >= 0) & (self.keys[index] == keys) if len(self.keys) else np.zeros(len(df), dtype=bool)
+
+        predictions = np.empty(len(df), dtype=np.float64)
+        predictions[found] = self.values[index[found]]
+        if not found.all():
+            predictions[~found] = self._fallback(df[~found])
+
+        hits = int(found.sum())
+        self.hits += hits
+        self.misses += len(df) - hits
+        return predictions
+
+    def _fallback(self, df):
+        if self.model is None:
+            raise KeyError(f"{len(df)} profiles are not in the compiled table and no model was given")
+        return predict_frame(self.model, self.preprocessor, df)
+
+# Score the top most frequent distinct profiles of a dataset and build the table from them
+def compile_from_data(model, preprocessor, df, top=None, batch_size=100_000, source=""):
+    profiles = df[feature_columns]
+    profiles = profiles[encode_keys(profiles) >= 0]
+    profiles = profiles.value_counts(sort=True).index.to_frame(index=False)
+    if top is not None:
+        profiles = profiles.head(top)
+
+    values = np.concatenate([predict_frame(model, preprocessor, profiles.iloc[start:start + batch_size])
+                             for start in range(0, len(profiles), batch_size)])
+    return CompiledPredictor(encode_keys(profiles), values, model, preprocessor, source)
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute model predictions into a lookup table")
+    parser.add_argument("--data", default="data/realistic_employee_dataset.csv",
+                        help="dataset whose profiles are precomputed")
+    parser.add_argument("--top", type=int, default=None,
+                        help="only keep the N most common profiles (default: all distinct profiles)")
+    parser.add_argument("--output", default=compiled_path, help="lookup table file to write")
+    parser.add_argument("--model", default=model_path, help="pickled model")
+    parser.add_argument("--preprocessor", default=preprocessor_path, help="pickled preprocessor")
+    args = parser.parse_args()
+
+    model, preprocessor = load_artifacts(args.model, args.preprocessor)
+    start = time.perf_counter()
+    compiled = compile_from_data(model, preprocessor, pd.read_csv(args.data), args.top,
+                                 source=artifact_hash(args.model, args.preprocessor))
+    compiled.save(args.output)
+    print(f"Compiled {len(compiled)} profiles in {time.perf_counter() - start:.2f}s to '{args.output}'")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
 from faker import Faker
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import functools
+import itertools
+import json
+import math
+import os
 import random
 
 fake = Faker('en_IN')  # Using Indian locale for more realistic names
@@ -96,31 +103,41 @@ job_base_salaries = {
     "Marketing Intern": 2.2
 }
 
+# Education multiplier
+education_multipliers = {
+    "High School": 0.8,
+    "Bachelor's": 1.0,
+    "Master's": 1.25,
+    "PhD": 1.5
+}
+
+# Industry multiplier
+industry_multipliers = {
+    "Information Technology": 1.0,
+    "Finance": 1.2,
+    "Healthcare": 0.9,
+    "Education": 0.75,
+    "Retail": 0.8,
+    "Telecommunications": 1.1,
+    "E-commerce": 1.15,
+    "Manufacturing": 0.85,
+    "Government": 0.8,
+    "Consulting": 1.25
+}
+
+# Age at which each education level is usually completed
+graduation_ages = {
+    "High School": 18,
+    "Bachelor's": 22,
+    "Master's": 24,
+    "PhD": 28
+}
+
 # Salary calculation with multiple factors
 def generate_salary(job_title, education, experience, industry, location, gender, performance_factor):
     base = job_base_salaries.get(job_title, 8.0)
     
-    # Education multiplier
-    edu_multiplier = {
-        "High School": 0.8,
-        "Bachelor's": 1.0,
-        "Master's": 1.25,
-        "PhD": 1.5
-    }.get(education, 1.0)
-    
-    # Industry multiplier
-    industry_multipliers = {
-        "Information Technology": 1.0,
-        "Finance": 1.2,
-        "Healthcare": 0.9,
-        "Education": 0.75,
-        "Retail": 0.8,
-        "Telecommunications": 1.1,
-        "E-commerce": 1.15,
-        "Manufacturing": 0.85,
-        "Government": 0.8,
-        "Consulting": 1.25
-    }
+    edu_multiplier = education_multipliers.get(education, 1.0)
     industry_multiplier = industry_multipliers.get(industry, 1.0)
     
     # Experience multiplier (non-linear growth)
@@ -152,6 +169,17 @@ def generate_salary(job_title, education, experience, industry, location, gender
     
     return max(final_salary, 2.0)  # Minimum salary floor
 
+# Experience rule per job level: (floor, cap, spread) of the minimum experience
+def experience_bounds(job_title):
+    if "Senior" in job_title or "Architect" in job_title:
+        return 5, 8, 10
+    elif "AI Researcher" in job_title:
+        return 3, 5, 15
+    elif any(word in job_title for word in ["Engineer", "Developer", "Scientist"]):
+        return 0, 2, 8
+    else:
+        return 0, 0, 6
+
 # Generate realistic experience based on job level and age
 def generate_experience(job_title, age, emp_type):
     if emp_type == "Internship":
@@ -159,26 +187,13 @@ def generate_experience(job_title, age, emp_type):
     
     max_possible_exp = max(0, age - 22)  # Assuming graduation at 22
     
-    if "Senior" in job_title or "Architect" in job_title:
-        min_exp = max(5, min(8, max_possible_exp))
-        return min(random.randint(min_exp, min_exp + 10), max_possible_exp)
-    elif "AI Researcher" in job_title:
-        min_exp = max(3, min(5, max_possible_exp))
-        return min(random.randint(min_exp, min_exp + 15), max_possible_exp)
-    elif any(word in job_title for word in ["Engineer", "Developer", "Scientist"]):
-        min_exp = max(0, min(2, max_possible_exp))
-        return min(random.randint(min_exp, min_exp + 8), max_possible_exp)
-    else:
-        return min(random.randint(0, 6), max_possible_exp)
+    floor, cap, spread = experience_bounds(job_title)
+    min_exp = max(floor, min(cap, max_possible_exp))
+    return min(random.randint(min_exp, min_exp + spread), max_possible_exp)
 
 # Generate age based on experience and education
 def generate_age(experience, education):
-    graduation_age = {
-        "High School": 18,
-        "Bachelor's": 22,
-        "Master's": 24,
-        "PhD": 28
-    }.get(education, 22)
+    graduation_age = graduation_ages.get(education, 22)
     
     min_age = graduation_age + experience
     max_age = min(60, min_age + random.randint(0, 8))
@@ -195,8 +210,8 @@ def meets_education_requirements(job_title, education):
         return education in job_education_requirements[job_title]
     return True
 
-# Generate remote work probability based on job type and industry
-def generate_remote_work(job_title, industry):
+# Remote work probability based on job type and industry
+def remote_work_probability(job_title, industry):
     # Higher probability for certain jobs
     remote_friendly_jobs = ["Software Engineer", "Data Analyst", "Full Stack Developer", 
                            "Machine Learning Engineer", "Data Scientist", "DevOps Engineer"]
@@ -216,121 +231,471 @@ def generate_remote_work(job_title, industry):
     elif industry in ["Manufacturing", "Healthcare", "Government"]:
         base_prob -= 0.2
     
-    base_prob = max(0.05, min(0.85, base_prob))  # Keep between 5% and 85%
-    
-    return "Yes" if random.random() < base_prob else "No"
+    return max(0.05, min(0.85, base_prob))  # Keep between 5% and 85%
 
-# Generate weekly hours based on job type and employment type
-def generate_weekly_hours(emp_type, job_title):
+# Generate remote work based on job type and industry
+def generate_remote_work(job_title, industry):
+    return "Yes" if random.random() < remote_work_probability(job_title, industry) else "No"
+
+# Weekly hours range based on job type and employment type
+def weekly_hours_range(emp_type, job_title):
     if emp_type == "Internship":
-        return random.randint(20, 35)
+        return 20, 35
     elif "Senior" in job_title or "Architect" in job_title:
-        return random.randint(45, 55)
+        return 45, 55
     else:
-        return random.randint(38, 50)
+        return 38, 50
+
+# Generate weekly hours based on job type and employment type
+def generate_weekly_hours(emp_type, job_title):
+    return random.randint(*weekly_hours_range(emp_type, job_title))
+
+# Extra certifications range based on job type
+def certification_bonus_range(job_title):
+    if any(word in job_title for word in ["Cyber", "Cloud", "DevOps"]):
+        return 1, 3
+    elif "Data" in job_title or "AI" in job_title or "ML" in job_title:
+        return 0, 2
+    return 0, 0
 
 # Generate certifications based on experience and job type
 def generate_certifications(experience, job_title):
     base_certs = max(0, experience // 2)  # Roughly 1 cert per 2 years experience
     
-    if any(word in job_title for word in ["Cyber", "Cloud", "DevOps"]):
-        base_certs += random.randint(1, 3)
-    elif "Data" in job_title or "AI" in job_title or "ML" in job_title:
-        base_certs += random.randint(0, 2)
+    low, high = certification_bonus_range(job_title)
+    if high:
+        base_certs += random.randint(low, high)
     
     return min(base_certs + random.randint(-1, 2), 8)  # Cap at 8 certifications
 
-# Generate data with improved logic
-data = []
-attempts = 0
-successful_records = 0
+# Lookup tables for the vectorized engine, built once from the rules above
+job_titles = list(job_base_salaries.keys())
+employment_types = list(employment_job_education.keys())
+location_names = list(locations.keys())
+employment_type_probs = [0.05, 0.25, 0.70]  # Realistic distribution
+female_prob = 0.45  # Slightly more realistic distribution
 
-while successful_records < num_rows and attempts < num_rows * 3:
-    attempts += 1
-    
-    # Basic demographics
-    name = fake.name()
-    gender = np.random.choice(['Male', 'Female'], p=[0.55, 0.45])  # Slightly more realistic distribution
-    
-    # Select employment type and compatible job
-    emp_type = np.random.choice(list(employment_job_education.keys()), 
-                               p=[0.05, 0.25, 0.70])  # Realistic distribution
-    emp_info = employment_job_education[emp_type]
-    
-    # Select education level appropriate for employment type
-    education = random.choice(emp_info["min_education"])
-    if random.random() < 0.3:  # 30% chance of higher education
-        edu_idx = education_levels.index(education)
-        if edu_idx < len(education_levels) - 1:
-            education = random.choice(education_levels[edu_idx:])
-    
-    # Select industry and compatible job
-    industry = random.choice(industries)
-    compatible_jobs = [job for job in emp_info["jobs"] 
-                      if is_job_industry_compatible(job, industry)]
-    
-    if not compatible_jobs:
-        continue  # Skip if no compatible jobs
-    
-    job_title = random.choice(compatible_jobs)
-    
-    # Check education requirements
-    if not meets_education_requirements(job_title, education):
-        continue
-    
-    # Generate experience and age
-    temp_age = random.randint(22, 58)
-    experience = generate_experience(job_title, temp_age, emp_type)
-    age = generate_age(experience, education)
+# Compatible jobs per (employment type, industry), padded with -1
+compatible_job_counts = np.zeros((len(employment_types), len(industries)), dtype=np.int64)
+compatible_job_table = np.full((len(employment_types), len(industries), len(job_titles)), -1, dtype=np.int64)
+for e, emp_type in enumerate(employment_types):
+    for i, industry in enumerate(industries):
+        jobs = [job_titles.index(job) for job in employment_job_education[emp_type]["jobs"]
+                if is_job_industry_compatible(job, industry)]
+        compatible_job_counts[e, i] = len(jobs)
+        compatible_job_table[e, i, :len(jobs)] = jobs
+
+# Starting education choices per employment type, padded with -1
+min_education_counts = np.array([len(employment_job_education[emp]["min_education"]) for emp in employment_types])
+min_education_table = np.full((len(employment_types), len(education_levels)), -1, dtype=np.int64)
+for e, emp_type in enumerate(employment_types):
+    edus = [education_levels.index(edu) for edu in employment_job_education[emp_type]["min_education"]]
+    min_education_table[e, :len(edus)] = edus
+
+job_education_allowed = np.array([[meets_education_requirements(job, edu) for edu in education_levels]
+                                  for job in job_titles])
+job_experience_bounds = np.array([experience_bounds(job) for job in job_titles])
+job_hours_range = np.array([[weekly_hours_range(emp, job) for job in job_titles] for emp in employment_types])
+job_certification_range = np.array([certification_bonus_range(job) for job in job_titles])
+job_remote_probability = np.array([[remote_work_probability(job, industry) for industry in industries]
+                                   for job in job_titles])
+
+job_base_salary_array = np.array([job_base_salaries[job] for job in job_titles])
+education_multiplier_array = np.array([education_multipliers[edu] for edu in education_levels])
+industry_multiplier_array = np.array([industry_multipliers[industry] for industry in industries])
+location_multiplier_array = np.array([locations[loc] for loc in location_names])
+graduation_age_array = np.array([graduation_ages[edu] for edu in education_levels])
+internship_index = employment_types.index("Internship")
+
+# Vectorized experience multiplier, same curve as generate_salary
+def experience_multiplier(experience):
+    experience = np.asarray(experience, dtype=np.float64)
+    return np.select(
+        [experience == 0, experience <= 2, experience <= 5, experience <= 10],
+        [0.8, 0.9 + experience * 0.1, 1.1 + (experience - 2) * 0.15, 1.55 + (experience - 5) * 0.1],
+        2.05 + (experience - 10) * 0.05,
+    )
+
+# Deterministic part of generate_salary from index columns: everything except the performance
+# factor, the random variance and the rounding
+def salary_formula(job, edu, exp, ind, loc, female):
+    return (job_base_salary_array[job] * education_multiplier_array[edu] * experience_multiplier(exp)
+            * industry_multiplier_array[ind] * location_multiplier_array[loc] * np.where(female, 0.92, 1.0))
+
+# Mean of normal(mean, std) clipped to [low, high]
+def clipped_normal_mean(mean, std, low, high):
+    def pdf(z):
+        return math.exp(-z * z / 2) / math.sqrt(2 * math.pi)
+    def cdf(z):
+        return (1 + math.erf(z / math.sqrt(2))) / 2
+    a, b = (low - mean) / std, (high - mean) / std
+    return (low * cdf(a) + high * (1 - cdf(b))
+            + mean * (cdf(b) - cdf(a)) + std * (pdf(a) - pdf(b)))
+
+# Expected value of performance_factor * variance, the two random factors of every salary
+expected_noise_factor = clipped_normal_mean(1.0, 0.15, 0.8, 1.3) * (0.85 + 1.2) / 2
+
+# Index columns of a frame with the dataset's string columns; unknown values get the last slot,
+# which holds generate_salary's fallback multiplier
+def formula_codes(df):
+    def codes(column, values):
+        codes = pd.Categorical(df[column], categories=values).codes.astype(np.int64)
+        return np.where(codes < 0, len(values), codes)
+    return {
+        "job": codes("Job Title", job_titles),
+        "edu": codes("Education", education_levels),
+        "ind": codes("Industry", industries),
+        "loc": codes("Location", location_names),
+        "exp": df["Experience"].to_numpy(dtype=np.float64),
+        "female": (df["Gender"] == "Female").to_numpy(),
+    }
+
+# Noise-free salary target for every row of a frame in lakhs. With expected=True it is scaled by the
+# mean of the random factors, i.e. the conditional mean a perfect model would predict
+def oracle_salary(df, expected=True):
+    codes = formula_codes(df)
+    salary = (np.append(job_base_salary_array, 8.0)[codes["job"]]
+              * np.append(education_multiplier_array, 1.0)[codes["edu"]]
+              * experience_multiplier(codes["exp"])
+              * np.append(industry_multiplier_array, 1.0)[codes["ind"]]
+              * np.append(location_multiplier_array, 1.0)[codes["loc"]]
+              * np.where(codes["female"], 0.92, 1.0))
+    return salary * expected_noise_factor if expected else salary
+
+# Draw `size` candidate rows at once and keep the ones passing the same checks as the row loop
+def generate_batch(rng, size):
+    emp = rng.choice(len(employment_types), size=size, p=employment_type_probs)
+    
+    # Education appropriate for employment type, 30% chance of higher education
+    edu = min_education_table[emp, (rng.random(size) * min_education_counts[emp]).astype(np.int64)]
+    upgrade = (rng.random(size) < 0.3) & (edu < len(education_levels) - 1)
+    upgraded = edu + (rng.random(size) * (len(education_levels) - edu)).astype(np.int64)
+    edu = np.where(upgrade, upgraded, edu)
+    
+    # Industry and compatible job
+    ind = rng.integers(0, len(industries), size=size)
+    counts = compatible_job_counts[emp, ind]
+    job = compatible_job_table[emp, ind, (rng.random(size) * counts).astype(np.int64)]
+    
+    keep = counts > 0
+    keep[keep] = job_education_allowed[job[keep], edu[keep]]
+    accepted = np.flatnonzero(keep)
+    emp, edu, ind, job = emp[accepted], edu[accepted], ind[accepted], job[accepted]
+    n = len(accepted)
+    
+    # Experience and age
+    max_possible_exp = rng.integers(22, 59, size=n) - 22
+    floor, cap, spread = job_experience_bounds[job].T
+    min_exp = np.maximum(floor, np.minimum(cap, max_possible_exp))
+    exp = np.minimum(rng.integers(min_exp, min_exp + spread + 1), max_possible_exp)
+    exp = np.where(emp == internship_index, rng.integers(0, 2, size=n), exp)
+    
+    min_age = graduation_age_array[edu] + exp
+    max_age = np.minimum(60, min_age + rng.integers(0, 9, size=n))
+    age = rng.integers(min_age, max_age + 1)
     
     # Validate age-experience relationship
-    min_working_age = {"High School": 18, "Bachelor's": 22, "Master's": 24, "PhD": 28}[education]
-    if age < min_working_age + experience:
-        continue
+    valid = age >= graduation_age_array[edu] + exp
+    columns = {"emp": emp, "edu": edu, "ind": ind, "job": job, "exp": exp, "age": age}
+    columns = {key: values[valid] for key, values in columns.items()}
+    accepted = accepted[valid]
+    n = len(accepted)
+    emp, edu, ind, job, exp = (columns[key] for key in ("emp", "edu", "ind", "job", "exp"))
     
     # Other attributes
-    location = random.choice(list(locations.keys()))
-    weekly_hours = generate_weekly_hours(emp_type, job_title)
-    remote_work = generate_remote_work(job_title, industry)
-    certifications = generate_certifications(experience, job_title)
-    performance_factor = np.random.normal(1.0, 0.15)  # Normal distribution around 1.0
-    performance_factor = max(0.8, min(1.3, performance_factor))  # Clamp between 0.8 and 1.3
+    columns["female"] = rng.random(n) < female_prob
+    columns["loc"] = rng.integers(0, len(location_names), size=n)
+    hours_low, hours_high = job_hours_range[emp, job].T
+    columns["hours"] = rng.integers(hours_low, hours_high + 1)
+    columns["remote"] = rng.random(n) < job_remote_probability[job, ind]
+    cert_low, cert_high = job_certification_range[job].T
+    certs = np.maximum(0, exp // 2) + rng.integers(cert_low, cert_high + 1) + rng.integers(-1, 3, size=n)
+    columns["certs"] = np.minimum(certs, 8)
+    performance_factor = np.clip(rng.normal(1.0, 0.15, size=n), 0.8, 1.3)
     
     # Generate salary
-    salary = generate_salary(job_title, education, experience, industry, 
-                           location, gender, performance_factor)
-    
-    data.append({
-        "Name": name,
-        "Age": age,
-        "Gender": gender,
-        "Education": education,
-        "Job Title": job_title,
-        "Experience": experience,
-        "Employment Type": emp_type,  # Fixed spelling
-        "Industry": industry,
-        "Location": location,
-        "Weekly Hours": weekly_hours,
-        "Remote Work": remote_work,
-        "Certifications": certifications,
-        "Salary": salary
-    })
+    salary = salary_formula(job, edu, exp, ind, columns["loc"], columns["female"]) * performance_factor
+    columns["salary"] = np.maximum(np.round(salary * rng.uniform(0.85, 1.2, size=n), 2), 2.0)
     
-    successful_records += 1
+    return columns, accepted
+
+dataset_columns = ["Name", "Age", "Gender", "Education", "Job Title", "Experience", "Employment Type",
+                   "Industry", "Location", "Weekly Hours", "Remote Work", "Certifications", "Salary"]
+
+# Turn index columns from generate_batch into the dataset layout. String columns are categoricals
+# over the fixed option lists, so every chunk has the same dictionary, and the small integer
+# columns are int8; CSV output is unchanged and Parquet output keeps the compact types.
+def batch_to_frame(columns, names):
+    def categorical(codes, categories):
+        return pd.Categorical.from_codes(codes, categories=categories)
+    
+    return pd.DataFrame({
+        "Name": names,
+        "Age": columns["age"].astype(np.int8),
+        "Gender": categorical(columns["female"].astype(np.int8), ["Male", "Female"]),
+        "Education": categorical(columns["edu"], education_levels),
+        "Job Title": categorical(columns["job"], job_titles),
+        "Experience": columns["exp"].astype(np.int8),
+        "Employment Type": categorical(columns["emp"], employment_types),
+        "Industry": categorical(columns["ind"], industries),
+        "Location": categorical(columns["loc"], location_names),
+        "Weekly Hours": columns["hours"].astype(np.int8),
+        "Remote Work": categorical(columns["remote"].astype(np.int8), ["No", "Yes"]),
+        "Certifications": columns["certs"].astype(np.int8),
+        "Salary": columns["salary"]
+    })
 
-# Create DataFrame and export
-df = pd.DataFrame(data)
+# Zero-row frame with the dataset's columns and dtypes, so an empty export still has a header and schema
+def empty_frame():
+    columns = {key: np.empty(0, dtype=np.int64) for key in
+               ("age", "female", "edu", "job", "exp", "emp", "ind", "loc", "hours", "remote", "certs")}
+    columns["salary"] = np.empty(0)
+    return batch_to_frame(columns, pd.Series([], dtype="string"))
+
+# Per-row Faker names, the original (slow) name source
+def faker_names(faker):
+    return lambda rng, size: [faker.name() for _ in range(size)]
+
+# Locale first/last-name lists loaded once into arrays, with every "First Last" combination precomputed
+@functools.lru_cache(maxsize=None)
+def load_name_pool(locale='en_IN'):
+    provider = next(p for p in Faker(locale).get_providers()
+                    if hasattr(p, "first_names") and hasattr(p, "last_names"))
+    
+    def name_list(names):
+        # Weighted lists are dicts of name -> weight, plain lists are sampled uniformly
+        if isinstance(names, dict):
+            weights = np.array(list(names.values()), dtype=np.float64)
+            return np.array(list(names.keys()), dtype=object), weights / weights.sum()
+        return np.array(names, dtype=object), None
+    
+    first_names, first_p = name_list(provider.first_names)
+    last_names, last_p = name_list(provider.last_names)
+    full_names = np.array([f"{first} {last}" for first in first_names for last in last_names], dtype=object)
+    
+    # Lists can repeat a name, so map each combination onto a unique dictionary entry
+    categories, codes = np.unique(full_names.astype(str), return_inverse=True)
+    return {
+        "first_count": len(first_names), "first_p": first_p,
+        "last_count": len(last_names), "last_p": last_p,
+        "names": full_names, "categories": categories.astype(object), "codes": codes,
+    }
+
+# Vectorized names drawn from the pool, optionally as a dictionary-encoded (categorical) column
+def pool_names(pool, dictionary=False):
+    def sample(rng, size):
+        first = rng.choice(pool["first_count"], size=size, p=pool["first_p"])
+        last = rng.choice(pool["last_count"], size=size, p=pool["last_p"])
+        combined = first * pool["last_count"] + last
+        if dictionary:
+            return pd.Categorical.from_codes(pool["codes"][combined], categories=pool["categories"])
+        return pool["names"][combined]
+    return sample
+
+# Generate num_rows records in batches, giving up after max_attempts candidates like the row loop did
+def generate_records(num_rows, rng, max_attempts=None, names=None):
+    if max_attempts is None:
+        max_attempts = num_rows * 3
+    if names is None:
+        names = faker_names(fake)
+    
+    batches = []
+    attempts = 0
+    successful_records = 0
+    acceptance = 0.5  # Refined after every batch
+    
+    while successful_records < num_rows and attempts < max_attempts:
+        needed = num_rows - successful_records
+        size = min(max_attempts - attempts, int(needed / acceptance * 1.1) + 64)
+        columns, accepted = generate_batch(rng, size)
+        acceptance = max(len(accepted) / size, 0.05)
+        
+        if len(accepted) > needed:
+            # Only count candidates up to the last record we keep
+            columns = {key: values[:needed] for key, values in columns.items()}
+            size = accepted[needed - 1] + 1
+        
+        attempts += size
+        successful_records += len(columns["age"])
+        batches.append(columns)
+    
+    columns = {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+    return batch_to_frame(columns, names(rng, successful_records)), attempts
+
+# Yield fixed-size DataFrame chunks so memory stays bounded by chunk_rows, not num_rows
+def iter_records(num_rows, rng, chunk_rows, max_attempts=None, names=None):
+    if max_attempts is None:
+        max_attempts = num_rows * 3
+    
+    attempts = 0
+    successful_records = 0
+    while successful_records < num_rows and attempts < max_attempts:
+        df, chunk_attempts = generate_records(min(chunk_rows, num_rows - successful_records), rng,
+                                              max_attempts - attempts, names)
+        attempts += chunk_attempts
+        successful_records += len(df)
+        yield df, chunk_attempts
+
+# Split a run into fixed-size shards, each seeded from the master seed by its index
+def shard_plan(total_rows, shard_rows, seed=None):
+    master = np.random.SeedSequence(seed)
+    num_shards = max(1, -(-total_rows // shard_rows))
+    shards = [(index, min(shard_rows, total_rows - index * shard_rows)) for index in range(num_shards)]
+    return master.entropy, shards
+
+# Stream one shard in chunks; the output depends only on the master seed and the shard index
+def iter_shard(rows, entropy, index, chunk_rows, name_source="faker", dictionary_names=False):
+    seed_seq = np.random.SeedSequence(entropy, spawn_key=(index,))
+    if name_source == "pool":
+        names = pool_names(load_name_pool(), dictionary_names)
+    else:
+        shard_fake = Faker('en_IN')
+        shard_fake.seed_instance(int(seed_seq.generate_state(1)[0]))
+        names = faker_names(shard_fake)
+    return iter_records(rows, np.random.default_rng(seed_seq), chunk_rows, names=names)
+
+# Sums and counts needed for the summary, mergeable across chunks and shards
+def dataset_summary(df, attempts):
+    return {
+        "rows": len(df),
+        "attempts": attempts,
+        "age_sum": int(df["Age"].sum()),
+        "experience_sum": int(df["Experience"].sum()),
+        "salary_sum": float(df["Salary"].sum()),
+        "remote_count": int((df["Remote Work"] == "Yes").sum()),
+        "gender_counts": {gender: int(count) for gender, count in df["Gender"].value_counts().items()},
+    }
+
+def merge_summaries(summaries):
+    merged = {"rows": 0, "attempts": 0, "age_sum": 0, "experience_sum": 0, "salary_sum": 0.0,
+              "remote_count": 0, "gender_counts": {}}
+    for summary in summaries:
+        for key, value in summary.items():
+            if key == "gender_counts":
+                for gender, count in value.items():
+                    merged[key][gender] = merged[key].get(gender, 0) + count
+            else:
+                merged[key] += value
+    return merged
+
+def print_summary(summary):
+    rows = max(summary["rows"], 1)
+    gender_split = {gender: round(count / rows, 2) for gender, count in
+                    sorted(summary["gender_counts"].items(), key=lambda item: -item[1])}
+    
+    print(f"Dataset successfully generated with {summary['rows']} rows")
+    print(f"Generation attempts: {summary['attempts']}")
+    print(f"\nDataset Statistics:")
+    print(f"Average age: {summary['age_sum'] / rows:.1f}")
+    print(f"Average experience: {summary['experience_sum'] / rows:.1f}")
+    print(f"Average salary: {summary['salary_sum'] / rows:.1f} lakhs")
+    print(f"Remote work percentage: {summary['remote_count'] / rows * 100:.1f}%")
+    print(f"Gender distribution: {gender_split}")
+
+# Stream (chunk, attempts) pairs to one CSV or Parquet file, folding the summary as we go.
+# With no chunks at all (--rows 0) the file is still written, with the header only.
+def write_chunks(chunks, path, file_format):
+    summary = merge_summaries([])
+    chunks = iter(chunks)
+    first = next(chunks, (empty_frame(), 0))
+    chunks = itertools.chain([first], chunks)
+    
+    if file_format == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        writer = None
+        try:
+            for df, attempts in chunks:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+                writer.write_table(table)
+                summary = merge_summaries([summary, dataset_summary(df, attempts)])
+        finally:
+            if writer is not None:
+                writer.close()
+        return summary
+    
+    with open(path, "w", newline="") as f:
+        for df, attempts in chunks:
+            df.to_csv(f, header=summary["rows"] == 0, index=False)
+            summary = merge_summaries([summary, dataset_summary(df, attempts)])
+    return summary
+
+# Process pool task: generate one shard and stream it to its own part file
+def write_shard(task):
+    index, rows, entropy, chunk_rows, name_source, dictionary_names, output_dir, file_format = task
+    file_name = f"part-{index:05d}.{file_format}"
+    summary = write_chunks(iter_shard(rows, entropy, index, chunk_rows, name_source, dictionary_names),
+                           os.path.join(output_dir, file_name), file_format)
+    return {"file": file_name, "index": index, "rows": summary["rows"], "summary": summary}
+
+# Generate shards across a process pool and list the part files in manifest.json
+def generate_sharded(total_rows, shard_rows, chunk_rows, seed, workers, output_dir, file_format,
+                     name_source="faker", dictionary_names=False):
+    entropy, shards = shard_plan(total_rows, shard_rows, seed)
+    os.makedirs(output_dir, exist_ok=True)
+    
+    tasks = [(index, rows, entropy, chunk_rows, name_source, dictionary_names, output_dir, file_format)
+             for index, rows in shards]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(write_shard, tasks))
+    
+    summary = merge_summaries([part.pop("summary") for part in parts])
+    manifest = {
+        "rows": summary["rows"],
+        "seed": entropy,
+        "shard_rows": shard_rows,
+        "chunk_rows": chunk_rows,
+        "names": name_source,
+        "format": file_format,
+        "columns": dataset_columns,
+        "parts": parts,
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return summary
 
-# Add some final validation and cleanup
-print(f"Dataset successfully generated with {len(df)} rows")
-print(f"Generation attempts: {attempts}")
-print(f"\nDataset Statistics:")
-print(f"Average age: {df['Age'].mean():.1f}")
-print(f"Average experience: {df['Experience'].mean():.1f}")
-print(f"Average salary: {df['Salary'].mean():.1f} lakhs")
-print(f"Remote work percentage: {(df['Remote Work'] == 'Yes').sum() / len(df) * 100:.1f}%")
-print(f"Gender distribution: {df['Gender'].value_counts(normalize=True).round(2).to_dict()}")
+def main():
+    parser = argparse.ArgumentParser(description="Generate the synthetic employee salary dataset")
+    parser.add_argument("--rows", type=int, default=num_rows, help="number of records to generate")
+    parser.add_argument("--seed", type=int, default=None, help="master seed for reproducible output")
+    parser.add_argument("--output", default="realistic_employee_dataset.csv",
+                        help="file to write, or the part-file directory when --workers is given")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="generate shards in this many processes, writing one part file per shard")
+    parser.add_argument("--shard-rows", type=int, default=1_000_000,
+                        help="rows per shard; together with --seed and --chunk-rows this fixes the output")
+    parser.add_argument("--chunk-rows", type=int, default=100_000,
+                        help="rows held in memory at a time while writing")
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None,
+                        help="output file format (default: parquet for a .parquet output, csv otherwise); "
+                             "Parquet keeps categorical and int8 columns")
+    parser.add_argument("--names", choices=["faker", "pool"], default="faker",
+                        help="'pool' samples names from the locale's name lists in bulk instead of calling Faker per row")
+    parser.add_argument("--dictionary-names", action="store_true",
+                        help="with --names pool, keep Name as a dictionary-encoded (categorical) column")
+    args = parser.parse_args()
+    if args.format is None:
+        args.format = "parquet" if args.output.endswith(".parquet") else "csv"
+    
+    if args.workers:
+        summary = generate_sharded(args.rows, args.shard_rows, args.chunk_rows, args.seed, args.workers,
+                                   args.output, args.format, args.names, args.dictionary_names)
+        print_summary(summary)
+        print(f"\nDataset parts and manifest.json exported to '{args.output}'")
+        return
+    
+    # Same shards as the worker mode, streamed in this process into one file
+    entropy, shards = shard_plan(args.rows, args.shard_rows, args.seed)
+    chunks = itertools.chain.from_iterable(
+        iter_shard(rows, entropy, index, args.chunk_rows, args.names, args.dictionary_names)
+        for index, rows in shards)
+    summary = write_chunks(chunks, args.output, args.format)
+    
+    print_summary(summary)
+    print(f"\nDataset exported to '{args.output}'")
 
-# Export to CSV
-df.to_csv("realistic_employee_dataset.csv", index=False)
-print("\nDataset exported to 'realistic_employee_dataset.csv'")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
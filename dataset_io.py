@@ -0,0 +1,54 @@
+# Column-typed loading of the employee datasets: categorical strings, small integers, column projection
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from predictor import feature_columns, feature_options, feature_ranges
+
+# String columns kept as pandas categoricals / Parquet dictionary columns
+categorical_columns = list(feature_options)
+
+# Small integer columns, downcast to int8/int16 when their values fit
+integer_columns = list(feature_ranges)
+
+# What the trainer needs: the 11 model features and the target, without Name
+training_columns = feature_columns + ["Salary"]
+
+# Convert a frame to the compact column types in place of object strings and int64
+def compact_frame(df):
+    for column in categorical_columns:
+        if column in df and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype("category")
+    for column in integer_columns:
+        if column not in df or df[column].isna().any():
+            continue
+        values = df[column]
+        # Files with missing rows parse integer columns as float; recover them once the gaps are gone
+        if values.dtype.kind == "f":
+            if not (values % 1 == 0).all():
+                continue
+            values = values.astype(np.int64)
+        df[column] = pd.to_numeric(values, downcast="integer")
+    return df
+
+# Load a CSV file, a Parquet file or a directory of generated part files (see custom_dataset.py --workers)
+# with compact column types; `columns` reads only those columns
+def read_dataset(path, columns=None):
+    if os.path.isdir(path):
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+        frames = [read_dataset(os.path.join(path, part["file"]), columns) for part in manifest["parts"]]
+        return compact_frame(pd.concat(frames, ignore_index=True))
+
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        names = pq.read_schema(path).names
+        # Decode plain string columns straight into dictionaries, skipping Python string objects
+        dictionary = [column for column in categorical_columns
+                      if column in names and (columns is None or column in columns)]
+        df = pq.read_table(path, columns=columns, read_dictionary=dictionary).to_pandas()
+    else:
+        df = pd.read_csv(path, usecols=columns, dtype={column: "category" for column in categorical_columns})
+    return compact_frame(df)
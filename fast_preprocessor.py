@@ -0,0 +1,88 @@
+# Fast-path replacement for the fitted one-hot ColumnTransformer
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+output_modes = ["dense", "csr", "ordinal"]
+
+# Encodes categoricals as integer codes and builds the output matrix directly from them.
+# "dense" and "csr" give the exact column layout of the one-hot ColumnTransformer, so a model
+# trained on it predicts the same values; "ordinal" gives one code column per categorical
+# and is meant for tree models trained on those codes.
+class FastPreprocessor:
+    def __init__(self, categorical_features, categories, numeric_features, output="csr"):
+        if output not in output_modes:
+            raise ValueError(f"output must be one of {output_modes}, got {output!r}")
+        self.categorical_features = list(categorical_features)
+        self.categories = [np.asarray(values, dtype=object) for values in categories]
+        self.numeric_features = list(numeric_features)
+        self.output = output
+        self.offsets = np.cumsum([0] + [len(values) for values in self.categories])
+        self.category_codes = [{value: code for code, value in enumerate(values)} for values in self.categories]
+
+    # Reuse the categories learned by the notebook's ColumnTransformer(onehot + passthrough)
+    @classmethod
+    def from_column_transformer(cls, transformer, output="csr"):
+        onehot = transformer.named_transformers_["onehot"]
+        categorical_features = transformer.transformers_[0][2]
+        remainder = transformer.transformers_[-1]
+        numeric_features = []
+        if remainder[0] == "remainder" and remainder[1] != "drop":
+            numeric_features = [transformer.feature_names_in_[i] for i in remainder[2]]
+        return cls(categorical_features, onehot.categories_, numeric_features, output)
+
+    # Learn sorted categories from a DataFrame, like OneHotEncoder does
+    @classmethod
+    def fit(cls, df, categorical_features, numeric_features, output="csr"):
+        categories = [np.sort(df[column].dropna().unique()) for column in categorical_features]
+        return cls(categorical_features, categories, numeric_features, output)
+
+    @property
+    def n_features_out(self):
+        if self.output == "ordinal":
+            return len(self.categorical_features) + len(self.numeric_features)
+        return int(self.offsets[-1]) + len(self.numeric_features)
+
+    def get_feature_names_out(self):
+        if self.output == "ordinal":
+            return np.array(self.categorical_features + self.numeric_features, dtype=object)
+        onehot = [f"onehot__{column}_{value}" for column, values in zip(self.categorical_features, self.categories)
+                  for value in values]
+        return np.array(onehot + [f"remainder__{column}" for column in self.numeric_features], dtype=object)
+
+    # Integer code of every categorical value (-1 for unknown categories), one column per feature
+    def codes(self, df):
+        if len(df) <= 64:
+            # Plain dict lookups beat building Categoricals for the app's one-row frames
+            return np.array([[codes.get(value, -1) for codes, value in zip(self.category_codes, row)]
+                             for row in df[self.categorical_features].to_numpy(dtype=object)],
+                            dtype=np.int64).reshape(len(df), len(self.categorical_features))
+        return np.column_stack([pd.Categorical(df[column], categories=values).codes
+                                for column, values in zip(self.categorical_features, self.categories)])
+
+    def transform(self, df):
+        n = len(df)
+        codes = self.codes(df)
+        numeric = df[self.numeric_features].to_numpy(dtype=np.float64)
+
+        if self.output == "ordinal":
+            return np.column_stack([codes.astype(np.float64), numeric])
+
+        width = self.n_features_out
+        if self.output == "dense":
+            X = np.zeros((n, width), dtype=np.float64)
+            known = codes >= 0
+            rows = np.broadcast_to(np.arange(n)[:, None], codes.shape)
+            X[rows[known], (codes + self.offsets[:-1])[known]] = 1.0
+            X[:, self.offsets[-1]:] = numeric
+            return X
+
+        # CSR: one entry per known category plus the numeric columns
+        known = codes >= 0
+        columns = np.concatenate([codes + self.offsets[:-1],
+                                  np.broadcast_to(self.offsets[-1] + np.arange(len(self.numeric_features)),
+                                                  (n, len(self.numeric_features)))], axis=1)
+        data = np.concatenate([np.ones(codes.shape), numeric], axis=1)
+        keep = np.concatenate([known, numeric != 0], axis=1)
+        indptr = np.concatenate([[0], np.cumsum(keep.sum(axis=1))])
+        return sp.csr_matrix((data[keep], columns[keep], indptr), shape=(n, width))
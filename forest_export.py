@@ -0,0 +1,158 @@
+# Flat, memory-mappable export of a fitted tree ensemble with a vectorized NumPy predictor
+import argparse
+import json
+import time
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+
+from predictor import model_path
+
+flat_model_path = "model/salary_forest.bin"
+
+file_magic = b"FLATFOREST1\n"
+alignment = 64
+
+# Node indices are int32 while they fit, which halves the child arrays; forests with 2^31 nodes or more
+# (e.g. unbounded-depth trees on tens of millions of rows) need int64. The file header records the dtype.
+def index_dtype(total_nodes):
+    return np.int32 if total_nodes <= np.iinfo(np.int32).max else np.int64
+
+# Node arrays of every tree concatenated; children are global node indices and leaves point to
+# themselves, so traversal is the same step repeated max_depth times with no leaf checks
+def flatten_forest(model):
+    trees = [estimator.tree_ for estimator in getattr(model, "estimators_", [model])]
+    sizes = [tree.node_count for tree in trees]
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+    index = index_dtype(int(np.sum(sizes, dtype=np.int64)))
+
+    features, thresholds, lefts, rights, values = [], [], [], [], []
+    for tree, offset in zip(trees, offsets):
+        nodes = np.arange(tree.node_count, dtype=np.int64)
+        leaf = tree.children_left == -1
+        features.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        lefts.append((np.where(leaf, nodes, tree.children_left) + offset).astype(index))
+        rights.append((np.where(leaf, nodes, tree.children_right) + offset).astype(index))
+        values.append(tree.value[:, 0, 0].astype(np.float64))
+
+    arrays = {
+        "roots": offsets.astype(index),
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "value": np.concatenate(values),
+    }
+    meta = {
+        "n_trees": len(trees),
+        "n_features": int(model.n_features_in_),
+        "max_depth": int(max(tree.max_depth for tree in trees)),
+    }
+    return meta, arrays
+
+# One file: magic, header length, JSON header with array offsets, then 64-byte aligned raw arrays
+def export_forest(model, path=flat_model_path):
+    meta, arrays = flatten_forest(model)
+
+    layout, position = {}, 0
+    for name, array in arrays.items():
+        layout[name] = {"offset": position, "dtype": array.dtype.str, "shape": list(array.shape)}
+        position += -(-array.nbytes // alignment) * alignment
+
+    header = json.dumps({**meta, "arrays": layout}).encode()
+    data_start = -(-(len(file_magic) + 8 + len(header)) // alignment) * alignment
+
+    with open(path, "wb") as f:
+        f.write(file_magic)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+    return meta
+
+# Predicts like RandomForestRegressor.predict from the flat arrays; loaded with mmap so
+# processes using the same file share one copy of the model in the page cache
+class FlatForest:
+    def __init__(self, meta, arrays):
+        self.n_trees = meta["n_trees"]
+        self.n_features_in_ = meta["n_features"]
+        self.max_depth = meta["max_depth"]
+        for name, array in arrays.items():
+            setattr(self, name, array)
+
+    @classmethod
+    def load(cls, path=flat_model_path, mmap=True):
+        with open(path, "rb") as f:
+            if f.read(len(file_magic)) != file_magic:
+                raise ValueError(f"{path} is not a flat forest file")
+            header_length = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_length))
+        data_start = -(-(len(file_magic) + 8 + header_length) // alignment) * alignment
+
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            if mmap:
+                # Plain ndarray view of the mapping, avoiding np.memmap overhead on every gather
+                arrays[name] = np.asarray(np.memmap(path, dtype=spec["dtype"], mode="r",
+                                                    shape=tuple(spec["shape"]), offset=data_start + spec["offset"]))
+            else:
+                arrays[name] = np.fromfile(path, dtype=spec["dtype"], count=int(np.prod(spec["shape"])),
+                                           offset=data_start + spec["offset"])
+        return cls(header, arrays)
+
+    # Leaf node index of every (row, tree) pair, walking all trees for a block of rows at once.
+    # Pairs that reached a leaf drop out, so each step only touches the paths still descending.
+    def apply(self, X):
+        n_rows, n_features = X.shape
+        X_flat = X.ravel()
+        nodes = np.tile(np.asarray(self.roots, dtype=np.int64), n_rows)
+        row_starts = np.repeat(np.arange(n_rows, dtype=np.int64) * n_features, self.n_trees)
+        active = np.arange(len(nodes))
+
+        for _ in range(self.max_depth + 1):
+            current = nodes[active]
+            left = self.left[current]
+            descending = left != current
+            if not descending.all():
+                active, current, left = active[descending], current[descending], left[descending]
+            if not len(active):
+                break
+            go_left = X_flat[row_starts[active] + self.feature[current]] <= self.threshold[current]
+            nodes[active] = np.where(go_left, left, self.right[current])
+
+        return nodes.reshape(n_rows, self.n_trees)
+
+    # Per-tree predictions, shape (rows, trees)
+    def predict_trees(self, X, block_size=4096):
+        if sp.issparse(X):
+            X = X.tocsr()
+        blocks = []
+        for start in range(0, X.shape[0], block_size):
+            block = X[start:start + block_size]
+            block = block.toarray() if sp.issparse(block) else np.asarray(block)
+            # sklearn compares float32 inputs against float64 thresholds
+            blocks.append(self.value[self.apply(np.ascontiguousarray(block, dtype=np.float32).astype(np.float64))])
+        if not blocks:
+            return np.empty((0, self.n_trees))
+        return np.concatenate(blocks)
+
+    def predict(self, X):
+        return self.predict_trees(X).mean(axis=1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a pickled forest to a flat memory-mappable file")
+    parser.add_argument("--model", default=model_path, help="pickled model to export")
+    parser.add_argument("--output", default=flat_model_path, help="flat model file to write")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model = joblib.load(args.model)
+    meta = export_forest(model, args.output)
+    print(f"Exported {meta['n_trees']} trees (max depth {meta['max_depth']}) to '{args.output}' "
+          f"in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# Ingestion of the differently shaped salary files into the canonical model schema, cached by file hash
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_io import categorical_columns, compact_frame, read_dataset, training_columns
+
+cache_dir = ".cache/ingest"
+
+# Bump when the normalization below changes, so cached results from older rules are not reused
+normalization_version = 2
+
+# Known source layouts: header renames onto the canonical columns and the factor that turns the
+# salary into lakhs per year (the unit of realistic_employee_dataset.csv and of the app). None means the
+# currency is unknown and the caller has to give the rate.
+schemas = {
+    "canonical": {"columns": {}, "salary_scale": 1.0},
+    # custom_employee_sal.csv: misspelled header, salaries in thousands
+    "custom_employee_sal": {"columns": {"Employement Type": "Employment Type"}, "salary_scale": 0.01},
+    # salary_data.csv: Kaggle-style headers and absolute yearly salaries in a currency other than rupees,
+    # without the workplace columns
+    "salary_data": {"columns": {"Education Level": "Education", "Years of Experience": "Experience"},
+                    "salary_scale": None},
+}
+
+# Spelling variants seen in the source files, mapped onto the app's options
+value_fixes = {
+    "Job Title": {"Data engineer": "Data Engineer"},
+    "Location": {"Bengalore": "Bangalore", "Karnataka": "Bangalore"},  # Karnataka is Bangalore's state
+}
+
+# Pick the schema whose renamed headers all appear in the file, falling back to canonical
+def detect_schema(columns):
+    for name, schema in schemas.items():
+        if schema["columns"] and set(schema["columns"]).issubset(columns):
+            return name
+    return "canonical"
+
+# SHA-256 of the file contents, read in blocks so large files are not loaded at once
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Rewrite a categorical through a value mapping on its categories only, then remap the codes
+def recode(series, fixes):
+    categories = series.cat.categories
+    if categories.empty:  # An all-missing column has nothing to rewrite
+        return series
+    fixed = pd.Index([fixes.get(str(value).strip(), str(value).strip()) for value in categories])
+    unique = fixed.unique()
+    lookup = unique.get_indexer(fixed)
+    codes = series.cat.codes.to_numpy()
+    return pd.Categorical.from_codes(np.where(codes >= 0, lookup[codes], -1), categories=unique)
+
+# Map a raw frame onto the canonical columns: rename headers, fix category spellings, scale salaries
+# to lakhs and add the columns a source lacks as missing values. `salary_scale` (lakhs of rupees per unit
+# of the source's Salary) is required for schemas whose currency is unknown.
+def normalize_frame(df, schema, salary_scale=None):
+    spec = schemas[schema]
+    scale = spec["salary_scale"] if spec["salary_scale"] is not None else salary_scale
+    if scale is None:
+        raise ValueError(f"{schema} salaries are not in rupees; give the salary scale in lakhs per unit")
+    df = df.rename(columns=spec["columns"])
+    df = df.dropna(subset=["Salary"]).reset_index(drop=True)
+    df = compact_frame(df)
+
+    for column in categorical_columns:
+        if column in df:
+            df[column] = recode(df[column], value_fixes.get(column, {}))
+        else:
+            df[column] = pd.Categorical([None] * len(df))
+    for column in training_columns:
+        if column not in df:
+            df[column] = np.nan
+
+    df["Salary"] = np.round(df["Salary"].to_numpy(dtype=np.float64) * scale, 2)
+    return df[training_columns]
+
+# Column names of a CSV file, a Parquet file or a part directory, read without loading any rows
+def source_header(path):
+    if os.path.isdir(path):
+        with open(os.path.join(path, "manifest.json")) as f:
+            return json.load(f)["columns"]
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    return list(pd.read_csv(path, nrows=0, encoding="utf-8-sig").columns)
+
+# The source names of the training columns a file has, so readers skip Name and any other extras
+def source_columns(header, schema):
+    source_names = {canonical: source for source, canonical in schemas[schema]["columns"].items()}
+    wanted = {source_names.get(column, column) for column in training_columns}
+    return [name for name in header if name in wanted]
+
+# dtypes that parse a CSV's string columns straight into categoricals, under their source names
+def csv_dtypes(schema):
+    source_names = {canonical: source for source, canonical in schemas[schema]["columns"].items()}
+    return {source_names.get(column, column): "category" for column in categorical_columns}
+
+# Only the training columns of the source, with the schema they are in
+def read_raw(path, schema=None):
+    header = source_header(path)
+    schema = schema or detect_schema(header)
+    columns = source_columns(header, schema)
+    if os.path.isdir(path) or path.endswith(".parquet"):
+        return read_dataset(path, columns), schema
+    return pd.read_csv(path, encoding="utf-8-sig", usecols=columns, dtype=csv_dtypes(schema)), schema
+
+# Canonical frames of at most chunk_size rows of a CSV file, Parquet file or part directory, for passes
+# that never hold the whole file (see out_of_core.py)
+def ingest_chunks(path, chunk_size, schema=None, salary_scale=None):
+    header = source_header(path)
+    schema = schema or detect_schema(header)
+    if os.path.isdir(path):
+        # Part directories from custom_dataset.py --workers: stream the parts in manifest order
+        with open(os.path.join(path, "manifest.json")) as f:
+            parts = json.load(f)["parts"]
+        for part in parts:
+            yield from ingest_chunks(os.path.join(path, part["file"]), chunk_size, schema, salary_scale)
+        return
+    columns = source_columns(header, schema)
+    if path.endswith(".parquet"):
+        from predict_batch import read_chunks
+        chunks = read_chunks(path, chunk_size, columns=columns)
+    else:
+        chunks = pd.read_csv(path, encoding="utf-8-sig", usecols=columns, dtype=csv_dtypes(schema),
+                             chunksize=chunk_size)
+    for chunk in chunks:
+        yield normalize_frame(chunk, schema, salary_scale)
+
+# Canonical frame for one source file. CSV results are cached as Parquet under the file's hash,
+# so later runs on an unchanged file skip parsing and cleaning.
+def ingest(path, schema=None, cache=cache_dir, salary_scale=None):
+    if cache and os.path.isfile(path) and not path.endswith(".parquet"):
+        schema = schema or detect_schema(source_header(path))
+        scale = schemas[schema]["salary_scale"] or salary_scale
+        key = f"{file_hash(path)}-{schema}-{scale}-v{normalization_version}"
+        cached = os.path.join(cache, f"{key}.parquet")
+        if os.path.exists(cached):
+            return read_dataset(cached)
+
+        df = normalize_frame(*read_raw(path, schema), salary_scale)
+        os.makedirs(cache, exist_ok=True)
+        partial = f"{cached}.{os.getpid()}.tmp"
+        df.to_parquet(partial, index=False, compression="zstd")
+        os.replace(partial, cached)
+        return df
+
+    return normalize_frame(*read_raw(path, schema), salary_scale)
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalize salary data files onto the model's schema")
+    parser.add_argument("inputs", nargs="+", help="CSV or Parquet files (or part directories) to ingest")
+    parser.add_argument("--output", default=None, help="write the combined canonical rows to this Parquet file")
+    parser.add_argument("--schema", choices=list(schemas), default=None, help="source layout (default: detected)")
+    parser.add_argument("--cache-dir", default=cache_dir, help="where normalized CSVs are cached")
+    parser.add_argument("--no-cache", action="store_true", help="always re-parse the inputs")
+    parser.add_argument("--salary-scale", type=float, default=None,
+                        help="lakhs of rupees per salary unit, for sources whose currency is unknown (salary_data)")
+    args = parser.parse_args()
+
+    frames = []
+    for path in args.inputs:
+        start = time.perf_counter()
+        try:
+            df = ingest(path, args.schema, None if args.no_cache else args.cache_dir, args.salary_scale)
+        except ValueError as e:
+            parser.error(f"{path}: {e}")
+        print(f"{path}: {len(df)} rows, median salary {df['Salary'].median():.2f} lakhs "
+              f"({time.perf_counter() - start:.3f}s)")
+        frames.append(df)
+
+    if args.output:
+        combined = compact_frame(pd.concat(frames, ignore_index=True))
+        combined.to_parquet(args.output, index=False, compression="zstd")
+        print(f"{len(combined)} rows written to '{args.output}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Salary ranges from the spread of the forest's per-tree predictions
+import numpy as np
+import scipy.sparse as sp
+
+from predictor import feature_columns
+
+# Quantiles computed by default: an 80% and a 50% band around the median
+default_quantiles = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# Whether a model has per-tree predictions to build ranges from (the out-of-core ridge model has none)
+def supports_intervals(model):
+    return hasattr(model, "estimators_") or hasattr(model, "predict_trees")
+
+# Per-tree predictions of a fitted forest in one pass: model.apply walks every tree for the whole
+# batch in compiled code, and one gather into the concatenated leaf values turns the leaf indices into
+# predictions. FlatForest models from forest_export.py already return per-tree predictions.
+class ForestIntervals:
+    def __init__(self, model):
+        self.model = model
+        if hasattr(model, "predict_trees"):
+            self.offsets = self.values = None
+            return
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        self.offsets = np.concatenate([[0], np.cumsum([tree.node_count for tree in trees])[:-1]]).astype(np.intp)
+        self.values = np.concatenate([tree.value[:, 0, 0] for tree in trees])
+
+    # Shape (rows, trees); the row mean equals model.predict
+    def tree_predictions(self, X):
+        if self.values is None:
+            return self.model.predict_trees(X)
+        return self.values[self.model.apply(X) + self.offsets]
+
+    # Mean prediction and quantiles of the per-tree predictions, shape (rows,) and (len(quantiles), rows).
+    # Rows are scored in blocks so the (rows, trees) matrix stays small on large batches.
+    def predict(self, X, quantiles=default_quantiles, block_size=65536):
+        if sp.issparse(X):
+            X = X.tocsr()
+        means, bands = [], []
+        for start in range(0, X.shape[0], block_size):
+            trees = self.tree_predictions(X[start:start + block_size])
+            means.append(trees.mean(axis=1))
+            bands.append(np.quantile(trees, quantiles, axis=1))
+        if not means:
+            return np.empty(0), np.empty((len(quantiles), 0))
+        return np.concatenate(means), np.concatenate(bands, axis=1)
+
+# Column name for a quantile, e.g. 0.1 -> "P10"
+def quantile_label(quantile):
+    return f"P{quantile * 100:g}"
+
+# Mean and quantile columns (in lakhs) for every row of a DataFrame with the model features
+def predict_intervals(intervals, preprocessor, df, quantiles=default_quantiles):
+    mean, bands = intervals.predict(preprocessor.transform(df[feature_columns]), quantiles)
+    return mean, {quantile_label(quantile): band for quantile, band in zip(quantiles, bands)}
@@ -1,21 +1,16 @@
 # streamlit app
-import streamlit as st
-import joblib
-import pandas as pd
-import numpy as np
+import time
+script_start = time.perf_counter()
 
-# Load models (with error handling)
-@st.cache_resource
-def load_models():
-    try:
-        model = joblib.load("model/salary_prediction_model.pkl")
-        preprocessor = joblib.load("preprocessor/salary_preprocessor.pkl")
-        return model, preprocessor
-    except FileNotFoundError as e:
-        st.error(f"Model files not found: {e}")
-        st.stop()
+import os
+from concurrent.futures import ThreadPoolExecutor
 
-model, preprocessor = load_models()
+import streamlit as st
+
+# Light imports only: pandas, scikit-learn and the pickled model are loaded in the background
+from metrics import InferenceMetrics, SamplingProfiler, start_metrics_server
+from predictor import (artifact_version, PredictionCache, model_path, preprocessor_path,
+                       feature_columns, feature_options, feature_ranges, validate_inputs)
 
 # App configuration
 st.set_page_config(
@@ -24,6 +19,109 @@ st.set_page_config(
     layout="wide"
 )
 
+# Cold-start timings of this server process, shown in the admin panel
+@st.cache_resource
+def startup_metrics():
+    return {}
+
+# The artifacts' on-disk identity; a retrained model changes it and everything below reloads
+try:
+    model_version = artifact_version(model_path, preprocessor_path)
+except FileNotFoundError as e:
+    st.error(f"Model files not found: {e}")
+    st.stop()
+
+# Load models plus the optional precomputed lookup table (built with compiled_predictor.py)
+# and the per-tree view of the forest used for salary ranges (None for models without trees)
+def load_models(metrics):
+    start = time.perf_counter()
+    from compiled_predictor import CompiledPredictor
+    from intervals import ForestIntervals, supports_intervals
+    from predictor import artifact_hash, load_artifacts
+    
+    model, preprocessor = load_artifacts(preprocessing="csr")
+    try:
+        # A table left over from an earlier model is ignored rather than mixed with this one. The model is
+        # only hashed once a table is found, so cold starts without one don't read the pickle twice.
+        compiled_predictor = CompiledPredictor.load(model=model, preprocessor=preprocessor,
+                                                    source=lambda: artifact_hash(model_path, preprocessor_path))
+    except (FileNotFoundError, ValueError):
+        compiled_predictor = None
+    intervals = ForestIntervals(model) if supports_intervals(model) else None
+    
+    metrics["model_load_seconds"] = time.perf_counter() - start
+    print(f"Model loaded in {metrics['model_load_seconds']:.2f}s", flush=True)
+    return model, preprocessor, compiled_predictor, intervals
+
+# Start loading in a background thread as soon as the first session arrives, once per artifact version
+@st.cache_resource(max_entries=1)
+def start_model_loading(version):
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+    future = executor.submit(load_models, startup_metrics())
+    executor.shutdown(wait=False)
+    return future
+
+model_loading = start_model_loading(model_version)
+
+# Ranges need per-tree predictions. Until the model has loaded, offer them; afterwards only for tree models
+def ranges_available():
+    if not model_loading.done() or model_loading.exception() is not None:
+        return True
+    return model_loading.result()[3] is not None
+
+# Wait for the background load if a prediction arrives before it finishes
+def get_models():
+    if not model_loading.done():
+        with st.spinner("Loading model..."):
+            model_loading.result()
+    try:
+        return model_loading.result()
+    except FileNotFoundError as e:
+        st.error(f"Model files not found: {e}")
+        st.stop()
+
+# Prediction results shared by every session, emptied when the model files change
+@st.cache_resource
+def get_prediction_cache():
+    return PredictionCache(max_size=1024)
+
+prediction_cache = get_prediction_cache()
+prediction_cache.check_version(model_version)
+
+# Salary ranges, cached the same way
+@st.cache_resource
+def get_range_cache():
+    return PredictionCache(max_size=1024)
+
+range_cache = get_range_cache()
+range_cache.check_version(model_version)
+
+# Stage timings of the prediction path, shared by every session. With SALARY_METRICS_PORT set they
+# are also served in Prometheus text format on http://127.0.0.1:<port>/metrics
+@st.cache_resource
+def get_inference_metrics():
+    inference_metrics = InferenceMetrics()
+    inference_metrics.gauge("cache_hits", "Prediction cache hits", lambda: prediction_cache.stats()["hits"])
+    inference_metrics.gauge("cache_misses", "Prediction cache misses", lambda: prediction_cache.stats()["misses"])
+    inference_metrics.gauge("cache_entries", "Prediction cache entries", lambda: prediction_cache.stats()["size"])
+    if os.environ.get("SALARY_METRICS_PORT"):
+        # A busy or invalid port only disables the endpoint; the app itself keeps working
+        try:
+            start_metrics_server(inference_metrics, int(os.environ["SALARY_METRICS_PORT"]))
+        except (OSError, ValueError) as e:
+            startup_metrics()["metrics_server_error"] = f"Metrics endpoint not started: {e}"
+            print(startup_metrics()["metrics_server_error"], flush=True)
+    return inference_metrics
+
+inference_metrics = get_inference_metrics()
+
+# Sampling profiler, switched on and off from the admin panel
+@st.cache_resource
+def get_profiler():
+    return SamplingProfiler()
+
+profiler = get_profiler()
+
 st.title("💰 Employee Salary Predictor")
 st.markdown("Predict employee salaries based on their profile and qualifications")
 
@@ -34,34 +132,22 @@ with col1:
     st.header("Personal Information")
     
     # Fixed age range to match realistic dataset
-    age = st.number_input("Age", min_value=18, max_value=65, value=25)
+    age = st.number_input("Age", *feature_ranges["Age"], value=25)
     
-    gender = st.selectbox("Gender", ["Male", "Female"])
+    gender = st.selectbox("Gender", feature_options["Gender"])
     
-    education = st.selectbox("Education Level", [
-        "High School", "Bachelor's", "Master's", "PhD"
-    ])
+    education = st.selectbox("Education Level", feature_options["Education"])
 
 with col2:
     st.header("Professional Details")
     
     # Updated job titles from the fixed dataset
-    job_title = st.selectbox("Job Title", [
-        "Machine Learning Engineer", "Data Analyst", "Cyber Security Analyst", 
-        "Data Scientist", "System Administrator", "Data Engineer", 
-        "Senior Software Engineer", "Systems Engineer", "Cloud Architect", 
-        "Software Engineer", "DevOps Engineer", "AI Researcher", 
-        "Technical Support Engineer", "Full Stack Developer", "Business Analyst",
-        "Software Development Intern", "Data Analytics Intern", "IT Support Intern", "Marketing Intern"
-    ])
+    job_title = st.selectbox("Job Title", feature_options["Job Title"])
     
     # Fixed spelling: Employment Type
-    employment_type = st.selectbox("Employment Type", ["Full-time", "Contract", "Internship"])
+    employment_type = st.selectbox("Employment Type", feature_options["Employment Type"])
     
-    industry = st.selectbox("Industry", [
-        "Information Technology", "Finance", "Healthcare", "Education", "Retail",
-        "Telecommunications", "E-commerce", "Manufacturing", "Government", "Consulting"
-    ])
+    industry = st.selectbox("Industry", feature_options["Industry"])
 
 # Additional details in expandable section
 with st.expander("Additional Details", expanded=True):
@@ -69,53 +155,31 @@ with st.expander("Additional Details", expanded=True):
     
     with col3:
         # Fixed experience range and better validation
-        experience = st.slider("Years of Experience", 0, 25, 2)
+        experience = st.slider("Years of Experience", *feature_ranges["Experience"], 2)
         
         # Updated locations from fixed dataset
-        location = st.selectbox("Location", [
-            "Mumbai", "Bangalore", "Chennai", "Delhi", "Hyderabad", "Pune"
-        ])
+        location = st.selectbox("Location", feature_options["Location"])
         
         # Better input handling for weekly hours
-        weekly_hours = st.number_input("Weekly Hours", min_value=20, max_value=60, value=40)
+        weekly_hours = st.number_input("Weekly Hours", *feature_ranges["Weekly Hours"], value=40)
     
     with col4:
         # Better input for certifications
-        certifications = st.number_input("Number of Certifications", min_value=0, max_value=10, value=2)
+        certifications = st.number_input("Number of Certifications", *feature_ranges["Certifications"], value=2)
         
         # Fixed remote work input
-        remote_work = st.selectbox("Remote Work", ["Yes", "No"])
-
-# Validation logic
-def validate_inputs(age, experience, education, job_title, employment_type):
-    errors = []
-    
-    # Age-experience validation
-    min_graduation_age = {"High School": 18, "Bachelor's": 21, "Master's": 23, "PhD": 28}
-    min_age_for_exp = min_graduation_age[education] + experience
-    
-    if age < min_age_for_exp:
-        errors.append(f"Age ({age}) is too low for {experience} years of experience with {education} education. Minimum age should be {min_age_for_exp}")
-    
-    # Education-job validation
-    if job_title == "AI Researcher" and education not in ["Master's", "PhD"]:
-        errors.append("AI Researcher typically requires Master's or PhD education")
-    
-    if job_title in ["Machine Learning Engineer", "Data Scientist"] and education == "High School":
-        errors.append(f"{job_title} typically requires at least Bachelor's degree")
+        remote_work = st.selectbox("Remote Work", feature_options["Remote Work"])
     
-    # Experience validation for senior roles
-    if "Senior" in job_title and experience < 3:
-        errors.append("Senior positions typically require at least 3 years of experience")
-    
-    if "Architect" in job_title and experience < 5:
-        errors.append("Architect positions typically require at least 5 years of experience")
-    
-    # Internship validation
-    if employment_type == "Internship" and experience > 2:
-        errors.append("Internships are typically for candidates with 0-2 years of experience")
-    
-    return errors
+    # Salary range from the spread of the forest's trees
+    show_range = ranges_available() and st.checkbox("Show salary range", value=False)
+    range_bands = {"80% range (P10–P90)": ("P10", "P90"), "50% range (P25–P75)": ("P25", "P75")}
+    range_band = st.radio("Range width", list(range_bands), horizontal=True) if show_range else None
+
+# The form is on screen; record how long the first run took to get here
+metrics = startup_metrics()
+if "first_render_seconds" not in metrics:
+    metrics["first_render_seconds"] = time.perf_counter() - script_start
+    print(f"Form rendered in {metrics['first_render_seconds']:.3f}s", flush=True)
 
 # Real-time validation
 validation_errors = validate_inputs(age, experience, education, job_title, employment_type)
@@ -125,89 +189,231 @@ if validation_errors:
     for error in validation_errors:
         st.write(f"• {error}")
 
+# Input features with correct column names and data types
+profile = {
+    "Age": int(age),
+    "Gender": gender,  # Keep as string, let preprocessor handle encoding
+    "Education": education,
+    "Job Title": job_title,
+    "Experience": int(experience),
+    "Employment Type": employment_type,  # Fixed spelling
+    "Industry": industry,
+    "Location": location,
+    "Weekly Hours": int(weekly_hours),
+    "Remote Work": remote_work,  # Keep as string
+    "Certifications": int(certifications)
+}
+
+def predict_profile(profile):
+    import pandas as pd
+    model, preprocessor, compiled_predictor, _ = get_models()
+    
+    # Precomputed profiles skip the model entirely
+    predicted_salary = None
+    if compiled_predictor is not None:
+        with inference_metrics.time("lookup"):
+            predicted_salary = compiled_predictor.lookup(profile)
+    
+    if predicted_salary is None:
+        inference_metrics.observe_batch(1)
+        with inference_metrics.time("dataframe"):
+            input_df = pd.DataFrame([profile])
+        
+        # Transform the input using the preprocessor
+        with inference_metrics.time("transform"):
+            X_transformed = preprocessor.transform(input_df)
+        
+        # Make prediction
+        with inference_metrics.time("predict"):
+            predicted_salary = model.predict(X_transformed)[0]
+    return float(predicted_salary)
+
+# Mean and quantiles of all trees' predictions in one pass (see intervals.py)
+def predict_range(profile):
+    import pandas as pd
+    from intervals import predict_intervals
+    _, preprocessor, _, intervals = get_models()
+    
+    inference_metrics.observe_batch(1)
+    with inference_metrics.time("range"):
+        mean, bands = predict_intervals(intervals, preprocessor, pd.DataFrame([profile]))
+    return {"mean": float(mean[0]), **{label: float(band[0]) for label, band in bands.items()}}
+
+def show_range_result(ranges, band):
+    low, high = range_bands[band]
+    st.metric(
+        label=f"Salary Range ({band.split(' range')[0]})",
+        value=f"₹{ranges[low]:.2f} – ₹{ranges[high]:.2f} Lakhs",
+        help="Spread of the individual trees' predictions; the median is "
+             f"₹{ranges['P50']:.2f} Lakhs"
+    )
+
+def show_results(predicted_salary):
+    # Display results with improved formatting
+    st.success("✅ Salary Prediction Complete!")
+    
+    # Create result display
+    col_result1, col_result2, col_result3 = st.columns(3)
+    
+    with col_result1:
+        st.metric(
+            label="Predicted Annual Salary",
+            value=f"₹{predicted_salary:.2f} Lakhs"
+        )
+    
+    with col_result2:
+        monthly_salary = predicted_salary / 12
+        st.metric(
+            label="Monthly Salary",
+            value=f"₹{monthly_salary:.2f} Lakhs"
+        )
+    
+    with col_result3:
+        monthly_amount = (predicted_salary * 100000) / 12
+        st.metric(
+            label="Monthly Amount",
+            value=f"₹{monthly_amount:,.0f}"
+        )
+
+# Insights for a profile whose prediction is already cached; never runs the model
+def show_insights(profile):
+    predicted_salary = prediction_cache.peek(profile)
+    if predicted_salary is None:
+        return
+    
+    # Additional insights
+    st.subheader("📊 Salary Insights")
+    
+    # Create insights based on the input
+    insights = []
+    
+    if predicted_salary > 20:
+        insights.append("🌟 This is a high-paying position in the Indian market")
+    elif predicted_salary > 15:
+        insights.append("💼 This is an above-average salary for the Indian market")
+    elif predicted_salary > 8:
+        insights.append("📈 This is a competitive salary in the Indian market")
+    else:
+        insights.append("📊 This is an entry-level salary range")
+    
+    if profile["Remote Work"] == "Yes":
+        insights.append("🏠 Remote work capability may provide additional value")
+    
+    if profile["Experience"] > 10:
+        insights.append("👨‍💼 Senior experience level commands premium salary")
+    
+    if profile["Education"] in ["Master's", "PhD"]:
+        insights.append("🎓 Higher education contributes to salary premium")
+    
+    for insight in insights:
+        st.write(insight)
+
 # Prediction button and logic
 if st.button("🔮 Predict Salary", type="primary", disabled=bool(validation_errors)):
     
     with st.spinner("Calculating predicted salary..."):
         try:
-            # Create input dataframe with correct column names and data types
-            input_df = pd.DataFrame([{
-                "Age": int(age),
-                "Gender": gender,  # Keep as string, let preprocessor handle encoding
-                "Education": education,
-                "Job Title": job_title,
-                "Experience": int(experience),
-                "Employment Type": employment_type,  # Fixed spelling
-                "Industry": industry,
-                "Location": location,
-                "Weekly Hours": int(weekly_hours),
-                "Remote Work": remote_work,  # Keep as string
-                "Certifications": int(certifications)
-            }])
-            
-            # Transform the input using the preprocessor
-            X_transformed = preprocessor.transform(input_df)
-            
-            # Make prediction
-            predicted_salary = model.predict(X_transformed)[0]
-            
-            # Display results with improved formatting
-            st.success("✅ Salary Prediction Complete!")
-            
-            # Create result display
-            col_result1, col_result2, col_result3 = st.columns(3)
-            
-            with col_result1:
-                st.metric(
-                    label="Predicted Annual Salary",
-                    value=f"₹{predicted_salary:.2f} Lakhs"
-                )
-            
-            with col_result2:
-                monthly_salary = predicted_salary / 12
-                st.metric(
-                    label="Monthly Salary",
-                    value=f"₹{monthly_salary:.2f} Lakhs"
-                )
-            
-            with col_result3:
-                monthly_amount = (predicted_salary * 100000) / 12
-                st.metric(
-                    label="Monthly Amount",
-                    value=f"₹{monthly_amount:,.0f}"
-                )
-            
-            # Additional insights
-            st.subheader("📊 Salary Insights")
-            
-            # Create insights based on the input
-            insights = []
-            
-            if predicted_salary > 20:
-                insights.append("🌟 This is a high-paying position in the Indian market")
-            elif predicted_salary > 15:
-                insights.append("💼 This is an above-average salary for the Indian market")
-            elif predicted_salary > 8:
-                insights.append("📈 This is a competitive salary in the Indian market")
-            else:
-                insights.append("📊 This is an entry-level salary range")
-            
-            if remote_work == "Yes":
-                insights.append("🏠 Remote work capability may provide additional value")
-            
-            if experience > 10:
-                insights.append("👨‍💼 Senior experience level commands premium salary")
-            
-            if education in ["Master's", "PhD"]:
-                insights.append("🎓 Higher education contributes to salary premium")
-            
-            for insight in insights:
-                st.write(insight)
+            with inference_metrics.time("total"):
+                # The option may have been ticked before the model turned out to have no trees
+                show_range = show_range and get_models()[3] is not None
+                if show_range:
+                    # The range pass also yields the forest's mean, which is the point prediction
+                    ranges = range_cache.get_or_compute(profile, predict_range)
+                    predicted_salary = prediction_cache.get_or_compute(profile, lambda profile: ranges["mean"])
+                else:
+                    predicted_salary = prediction_cache.get_or_compute(profile, predict_profile)
+                st.session_state["predicted_profile"] = PredictionCache.key(profile)
+                with inference_metrics.time("render"):
+                    show_results(predicted_salary)
+                    if show_range:
+                        show_range_result(ranges, range_band)
+                    show_insights(profile)
                 
         except Exception as e:
             st.error(f"Error making prediction: {str(e)}")
             st.write("Please ensure all model files are properly trained and saved with the correct feature names.")
 
+elif not validation_errors and st.session_state.get("predicted_profile") == PredictionCache.key(profile):
+    # Other widgets rerun the script; keep showing the last result from the cache
+    predicted_salary = prediction_cache.peek(profile)
+    if predicted_salary is not None:
+        show_results(predicted_salary)
+        ranges = range_cache.peek(profile) if show_range else None
+        if ranges is not None:
+            show_range_result(ranges, range_band)
+        show_insights(profile)
+
+# What-if sweep: the current profile over every value of one or two features, scored in one batch
+with st.expander("🔍 What-if Sweep"):
+    sweep_features = st.multiselect("Features to vary (one for a curve, two for a heatmap)", feature_columns,
+                                    max_selections=2)
+    
+    if st.button("Run Sweep", disabled=not sweep_features):
+        import numpy as np
+        import pandas as pd
+        from sweep import sweep
+        
+        model, preprocessor, _, _ = get_models()
+        with inference_metrics.time("sweep"):
+            values, predictions, codes = sweep(model, preprocessor, profile, sweep_features)
+        inference_metrics.observe_batch(predictions.size)
+        # Leave out combinations the validation rules above would reject
+        predictions = np.where(codes == 0, predictions, np.nan)
+        
+        if len(sweep_features) == 1:
+            curve = pd.DataFrame({"Predicted Salary (Lakhs)": predictions},
+                                 index=pd.Index(values[0], name=sweep_features[0]))
+            if sweep_features[0] in feature_ranges:
+                st.line_chart(curve)
+            else:
+                st.bar_chart(curve)
+        else:
+            heatmap = pd.DataFrame(predictions, index=pd.Index(values[1], name=sweep_features[1]),
+                                   columns=pd.Index(values[0], name=sweep_features[0]))
+            st.dataframe(heatmap.style.background_gradient(cmap="Greens", axis=None).format("{:.2f}", na_rep="–"))
+        
+        if codes.any():
+            st.caption(f"{int(np.count_nonzero(codes))} of {codes.size} combinations break the validation rules "
+                       "and are left out")
+
+# Cache statistics for operators, shown with ?admin=1 in the URL
+if st.query_params.get("admin") == "1":
+    with st.sidebar:
+        st.header("🛠️ Admin")
+        stats = prediction_cache.stats()
+        st.metric("Cache hit rate", f"{stats['hit_rate']:.0%}")
+        st.write(f"Hits: {stats['hits']} • Misses: {stats['misses']}")
+        st.write(f"Entries: {stats['size']} / {stats['max_size']}")
+        st.caption(f"Model file version: {model_version[0][1]}")
+        st.write(f"First render: {metrics['first_render_seconds'] * 1000:.0f} ms")
+        if "model_load_seconds" in metrics:
+            st.write(f"Model load: {metrics['model_load_seconds']:.2f}s (background)")
+        else:
+            st.write("Model load: in progress")
+        if st.button("Clear prediction cache"):
+            prediction_cache.clear()
+            st.rerun()
+        
+        st.subheader("Stage latency")
+        if "metrics_server_error" in metrics:
+            st.warning(metrics["metrics_server_error"])
+        for stage in ("total", "lookup", "dataframe", "transform", "predict", "range", "render", "sweep"):
+            count, total, median = inference_metrics.stage_seconds.summary(stage)
+            if count:
+                st.write(f"{stage}: {count} calls, mean {total / count * 1000:.1f} ms, p50 ≤ {median * 1000:g} ms")
+        with st.expander("Prometheus metrics"):
+            st.code(inference_metrics.render(), language="text")
+        
+        # Sampling profiler: samples every thread's stack while switched on
+        if st.toggle("Sampling profiler", value=profiler.running):
+            profiler.start()
+            st.caption(f"{profiler.samples} samples so far")
+            for function, share in profiler.top(10):
+                st.write(f"{share:.0%} {function}")
+            st.download_button("Download collapsed stacks", profiler.collapsed(), file_name="profile.folded")
+        elif profiler.running:
+            profiler.stop()
+
 # Additional information
 with st.expander("ℹ️ About this Predictor"):
     st.write("""
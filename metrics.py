@@ -0,0 +1,182 @@
+# Inference instrumentation: stage timers, histograms, Prometheus text export and a sampling profiler
+import collections
+import contextlib
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+latency_buckets = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+batch_size_buckets = tuple(2 ** power for power in range(17))  # 1 .. 65536 rows
+
+# Cumulative-bucket histogram with one series per label value, like a Prometheus client histogram
+class Histogram:
+    def __init__(self, name, help_text, buckets, label=None):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label = label
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, label_value=None):
+        # Index of the first bucket that holds the value; len(buckets) is the +Inf bucket
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self.lock:
+            counts, total = self.series.get(label_value, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self.series[label_value] = (counts, total + value)
+
+    # Count, sum and approximate quantile (upper bucket bound) of one series
+    def summary(self, label_value=None, quantile=0.5):
+        with self.lock:
+            counts, total = self.series.get(label_value, ([0] * (len(self.buckets) + 1), 0.0))
+            counts = list(counts)
+        count = sum(counts)
+        running = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            running += bucket_count
+            if count and running >= quantile * count:
+                return count, total, bound
+        return count, total, None
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = {label_value: (list(counts), total) for label_value, (counts, total) in self.series.items()}
+        for label_value, (counts, total) in sorted(series.items(), key=lambda item: str(item[0])):
+            labels = f'{self.label}="{label_value}",' if self.label else ""
+            running = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                running += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f'{self.name}_bucket{{{labels}le="{le}"}} {running}')
+            suffix = f"{{{labels.rstrip(',')}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total:.9g}")
+            lines.append(f"{self.name}_count{suffix} {running}")
+        return lines
+
+# Stage latencies, batch sizes and gauges read at export time (e.g. cache counters)
+class InferenceMetrics:
+    def __init__(self, prefix="salary"):
+        self.prefix = prefix
+        self.stage_seconds = Histogram(f"{prefix}_stage_seconds", "Time spent in each inference stage",
+                                       latency_buckets, label="stage")
+        self.batch_rows = Histogram(f"{prefix}_batch_rows", "Rows per scored batch", batch_size_buckets)
+        self.gauges = {}
+
+    @contextlib.contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds.observe(time.perf_counter() - start, stage)
+
+    def observe_batch(self, rows):
+        self.batch_rows.observe(rows)
+
+    # fn() is called at export time and its number reported as a gauge
+    def gauge(self, name, help_text, fn):
+        self.gauges[f"{self.prefix}_{name}"] = (help_text, fn)
+
+    # Prometheus text exposition format
+    def render(self):
+        lines = self.stage_seconds.render() + self.batch_rows.render()
+        for name, (help_text, fn) in self.gauges.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {fn():.9g}"]
+        return "\n".join(lines) + "\n"
+
+    # Write atomically, e.g. for node_exporter's textfile collector
+    def write(self, path):
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, "w") as f:
+            f.write(self.render())
+        os.replace(partial, path)
+
+# Serve GET /metrics from a daemon thread; returns the server so it can be shut down
+def start_metrics_server(metrics, port, host="127.0.0.1"):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# Statistical profiler that can be switched on and off at runtime: a daemon thread samples the
+# stacks of all other threads every `interval` seconds and counts them. Costs nothing while stopped.
+class SamplingProfiler:
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.thread = None
+
+    def reset(self):
+        with self.lock:
+            self.stacks.clear()
+            self.samples = 0
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            with self.lock:
+                for thread_id, frame in frames.items():
+                    if thread_id == own:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        code = frame.f_code
+                        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                        frame = frame.f_back
+                    self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    # Collapsed stacks ("a;b;c count" per line), the input format of flame graph tools
+    def collapsed(self):
+        with self.lock:
+            return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    # Functions seen on the most samples, counting each function once per stack
+    def top(self, limit=20):
+        functions = collections.Counter()
+        with self.lock:
+            for stack, count in self.stacks.items():
+                for function in set(stack.split(";")):
+                    functions[function] += count
+            samples = max(self.samples, 1)
+        return [(function, count / samples) for function, count in functions.most_common(limit)]
@@ -0,0 +1,134 @@
+# Out-of-core training: chunked passes over files larger than memory
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder
+
+from fast_preprocessor import FastPreprocessor
+from ingest import ingest_chunks
+from predictor import feature_columns
+
+# Salary is a product of per-feature multipliers, so log(salary) is additive in the one-hot
+# features. Experience is one-hot too, which captures the piecewise experience curve exactly.
+onehot_features = ["Gender", "Education", "Job Title", "Experience", "Employment Type", "Industry", "Location",
+                   "Remote Work"]
+
+# Linear model on log(salary) fitted from accumulated sufficient statistics
+class LogLinearRegressor:
+    def __init__(self, coef, intercept, smearing=1.0):
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.smearing_ = smearing  # exp(residual variance / 2) corrects the bias of exp(mean log)
+        self.n_features_in_ = len(coef)
+
+    def predict(self, X):
+        return np.exp(np.asarray(X @ self.coef_).ravel() + self.intercept_) * self.smearing_
+
+    def score(self, X, y):
+        return r2_score_from_sums(accumulate_r2(self.predict(X), np.asarray(y)))
+
+# Canonical rows of the file (see ingest.py), skipping rows that miss a feature like train.load_dataset does
+def training_chunks(path, chunk_size, schema=None):
+    for chunk in ingest_chunks(path, chunk_size, schema):
+        yield chunk[chunk[feature_columns].notna().all(axis=1)]
+
+# First pass: every category seen in the file, sorted like OneHotEncoder would
+def fit_vocabulary(path, chunk_size, schema=None):
+    vocabulary = {column: set() for column in onehot_features}
+    rows = 0
+    for chunk in training_chunks(path, chunk_size, schema):
+        for column in onehot_features:
+            vocabulary[column].update(chunk[column].dropna().unique().tolist())
+        rows += len(chunk)
+    return {column: sorted(values) for column, values in vocabulary.items()}, rows
+
+# A ColumnTransformer with the streamed vocabulary, so the app and the batch tools load it as usual
+def build_preprocessor(vocabulary):
+    categories = [vocabulary[column] for column in onehot_features]
+    onehot = OneHotEncoder(categories=categories, sparse_output=False, handle_unknown='ignore')
+    transformer = ColumnTransformer(transformers=[("onehot", onehot, onehot_features)], remainder="passthrough")
+
+    # Fitting with explicit categories only needs one row that has every column
+    sample = pd.DataFrame({column: [vocabulary[column][0]] if column in vocabulary else [0]
+                           for column in feature_columns})
+    return transformer.fit(sample)
+
+# Rows held out for testing, chosen from the row position alone so every pass agrees without shuffling.
+# Multiplying by 2^64 / golden ratio spreads positions evenly over [0, 2^64), so the share of rows below
+# test_size * 2^64 matches test_size to within a few rows, with no regular stride in the held-out rows.
+def test_mask(start, length, test_size):
+    positions = np.arange(start, start + length, dtype=np.uint64)
+    threshold = np.uint64(min(int(test_size * 2.0 ** 64), 2 ** 64 - 1))
+    return positions * np.uint64(0x9E3779B97F4A7C15) < threshold
+
+# Second pass: X'X, X'y and y'y of the training rows, with a leading intercept column
+def accumulate_normal_equations(path, chunk_size, fast, test_size, schema=None):
+    width = fast.n_features_out + 1
+    XtX = np.zeros((width, width))
+    Xty = np.zeros(width)
+    yty = 0.0
+    n = 0
+    start = 0
+
+    for chunk in training_chunks(path, chunk_size, schema):
+        train = ~test_mask(start, len(chunk), test_size)
+        start += len(chunk)
+        chunk = chunk[train]
+        X = sp.hstack([np.ones((len(chunk), 1)), fast.transform(chunk)], format="csr")
+        y = np.log(np.maximum(chunk["Salary"].to_numpy(dtype=np.float64), 1e-6))
+
+        XtX += (X.T @ X).toarray()
+        Xty += X.T @ y
+        yty += y @ y
+        n += len(y)
+    return XtX, Xty, yty, n
+
+# Ridge solution of the accumulated normal equations (the intercept is not penalized)
+def solve_normal_equations(XtX, Xty, yty, n, alpha=1.0):
+    penalty = alpha * np.eye(len(Xty))
+    penalty[0, 0] = 0.0
+    beta = np.linalg.solve(XtX + penalty, Xty)
+    residual_variance = max((yty - 2 * beta @ Xty + beta @ XtX @ beta) / max(n, 1), 0.0)
+    return LogLinearRegressor(beta[1:], beta[0], float(np.exp(residual_variance / 2)))
+
+def accumulate_r2(predictions, y):
+    return np.array([len(y), y.sum(), (y ** 2).sum(), ((y - predictions) ** 2).sum()])
+
+def r2_score_from_sums(sums):
+    n, total, total_squares, sse = sums
+    sst = total_squares - total ** 2 / n
+    return 1 - sse / sst if sst > 0 else float("nan")
+
+# Third pass: R2 of the held-out rows
+def evaluate(path, chunk_size, fast, model, test_size, schema=None):
+    sums = np.zeros(4)
+    start = 0
+    for chunk in training_chunks(path, chunk_size, schema):
+        test = test_mask(start, len(chunk), test_size)
+        start += len(chunk)
+        if test.any():
+            chunk = chunk[test]
+            sums += accumulate_r2(model.predict(fast.transform(chunk)), chunk["Salary"].to_numpy(dtype=np.float64))
+    return r2_score_from_sums(sums) if sums[0] else float("nan")
+
+# Train without ever holding more than chunk_size rows; returns the model, preprocessor and test R2
+def train_out_of_core(path, chunk_size=100_000, test_size=0.2, alpha=1.0, log=print, schema=None):
+    if not 0 <= test_size < 1:
+        raise ValueError(f"test_size must be in [0, 1), got {test_size}")
+    vocabulary, rows = fit_vocabulary(path, chunk_size, schema)
+    if not rows:
+        raise ValueError(f"{path} has no rows with all {len(feature_columns)} model features")
+    log(f"Pass 1: vocabulary of {sum(len(values) for values in vocabulary.values())} categories over {rows} rows")
+
+    preprocessor = build_preprocessor(vocabulary)
+    fast = FastPreprocessor.from_column_transformer(preprocessor, "csr")
+
+    XtX, Xty, yty, n = accumulate_normal_equations(path, chunk_size, fast, test_size, schema)
+    model = solve_normal_equations(XtX, Xty, yty, n, alpha)
+    log(f"Pass 2: fitted {model.n_features_in_} coefficients on {n} training rows "
+        f"({rows - n} rows, {(rows - n) / rows:.1%} of the file, held out for testing)")
+
+    test_r2 = evaluate(path, chunk_size, fast, model, test_size, schema) if rows > n else float("nan")
+    log(f"Pass 3: test set R2 {test_r2:.4f}")
+    return model, preprocessor, test_r2
@@ -0,0 +1,130 @@
+# Batch salary prediction over CSV/Parquet files
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from intervals import ForestIntervals, predict_intervals, quantile_label, supports_intervals
+from predictor import (load_artifacts, predict_frame, validate_frame, model_path, preprocessor_path,
+                       preprocessing_modes)
+
+# Read a CSV or Parquet file as DataFrame chunks of at most chunk_size rows, optionally only some columns
+def read_chunks(path, chunk_size, columns=None):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns)
+
+# Stream DataFrame chunks to one CSV or Parquet file
+def write_chunks(chunks, path):
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for df in chunks:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+
+    with open(path, "w", newline="") as f:
+        for index, df in enumerate(chunks):
+            df.to_csv(f, header=index == 0, index=False)
+
+# Score every chunk and add the prediction column, keeping count of rows and time spent
+# With `intervals` (an intervals.ForestIntervals), quantile columns of the per-tree predictions are
+# added from the same pass, e.g. "Predicted Salary P10"
+def score_chunks(chunks, model, preprocessor, stats, column="Predicted Salary", intervals=None, quantiles=()):
+    added_columns = [column]
+    if intervals is not None:
+        added_columns += [f"{column} {quantile_label(quantile)}" for quantile in quantiles]
+    empty = None
+    for df in chunks:
+        if df.empty:
+            # Validation dropped every row of the chunk. Skip it, but keep one in case every chunk is empty,
+            # so the writer still produces a file with the full header
+            if empty is None:
+                empty = df.assign(**{name: np.empty(0) for name in added_columns})
+            continue
+        start = time.perf_counter()
+        if intervals is None:
+            df[column] = predict_frame(model, preprocessor, df).round(2)
+        else:
+            mean, bands = predict_intervals(intervals, preprocessor, df, quantiles)
+            df[column] = mean.round(2)
+            for label, band in bands.items():
+                df[f"{column} {label}"] = band.round(2)
+        stats["predict_seconds"] += time.perf_counter() - start
+        stats["rows"] += len(df)
+        yield df
+    if stats["rows"] == 0 and empty is not None:
+        yield empty
+
+# Check every chunk with the app's rules; 'flag' adds the error code column, 'drop' removes the bad rows
+def validate_chunks(chunks, mode, stats, column="Validation Errors"):
+    for df in chunks:
+        codes = validate_frame(df)
+        stats["invalid_rows"] += int(np.count_nonzero(codes))
+        if mode == "drop":
+            df = df[codes == 0].reset_index(drop=True)
+        else:
+            df[column] = codes
+        yield df
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict salaries for every row of a CSV or Parquet file")
+    parser.add_argument("input", help="CSV or Parquet file with the model feature columns")
+    parser.add_argument("--output", default=None,
+                        help="file to write (default: <input>_predictions with the same extension)")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="rows scored at a time")
+    parser.add_argument("--model", default=model_path, help="pickled model")
+    parser.add_argument("--preprocessor", default=preprocessor_path, help="pickled preprocessor")
+    parser.add_argument("--preprocessing", choices=preprocessing_modes, default="csr",
+                        help="'sklearn' runs the pickled ColumnTransformer, 'dense'/'csr' the equivalent fast path")
+    parser.add_argument("--quantiles", default=None,
+                        help="comma-separated quantiles of the per-tree predictions to add, e.g. 0.1,0.9")
+    parser.add_argument("--validate", choices=["off", "flag", "drop"], default="off",
+                        help="apply the app's profile rules: 'flag' adds a 'Validation Errors' code column "
+                             "(see predictor.validation_codes), 'drop' skips rows that break a rule")
+    args = parser.parse_args()
+
+    output = args.output
+    if output is None:
+        root, ext = os.path.splitext(args.input)
+        output = f"{root}_predictions{ext}"
+
+    model, preprocessor = load_artifacts(args.model, args.preprocessor, args.preprocessing)
+
+    stats = {"rows": 0, "predict_seconds": 0.0, "invalid_rows": 0}
+    start = time.perf_counter()
+    chunks = read_chunks(args.input, args.chunk_size)
+    if args.validate != "off":
+        chunks = validate_chunks(chunks, args.validate, stats)
+    intervals, quantiles = None, ()
+    if args.quantiles:
+        if not supports_intervals(model):
+            parser.error(f"--quantiles needs a tree ensemble; {type(model).__name__} has no per-tree predictions")
+        intervals = ForestIntervals(model)
+        quantiles = [float(quantile) for quantile in args.quantiles.split(",")]
+    write_chunks(score_chunks(chunks, model, preprocessor, stats, intervals=intervals, quantiles=quantiles), output)
+    elapsed = time.perf_counter() - start
+
+    print(f"Scored {stats['rows']} rows in {elapsed:.2f}s ({stats['rows'] / max(elapsed, 1e-9):,.0f} rows/sec)")
+    print(f"Model time: {stats['predict_seconds']:.2f}s ({stats['rows'] / max(stats['predict_seconds'], 1e-9):,.0f} rows/sec)")
+    if args.validate != "off":
+        action = "dropped" if args.validate == "drop" else "flagged"
+        print(f"Validation: {stats['invalid_rows']} rows {action}")
+    print(f"Predictions written to '{output}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+# Shared inference helpers for the Streamlit app and the batch tools
+# joblib and the fast preprocessor (NumPy, pandas, SciPy) are imported where they are used, so the
+# app can import the schema and validation helpers without paying for the scientific stack
+import hashlib
+import math
+import os
+import threading
+from collections import OrderedDict
+
+model_path = "model/salary_prediction_model.pkl"
+preprocessor_path = "preprocessor/salary_preprocessor.pkl"
+
+# Columns the preprocessor was fitted on, in the order the app sends them
+feature_columns = ["Age", "Gender", "Education", "Job Title", "Experience", "Employment Type",
+                   "Industry", "Location", "Weekly Hours", "Remote Work", "Certifications"]
+
+# Choices offered by the app for each categorical feature
+feature_options = {
+    "Gender": ["Male", "Female"],
+    "Education": ["High School", "Bachelor's", "Master's", "PhD"],
+    "Job Title": [
+        "Machine Learning Engineer", "Data Analyst", "Cyber Security Analyst", 
+        "Data Scientist", "System Administrator", "Data Engineer", 
+        "Senior Software Engineer", "Systems Engineer", "Cloud Architect", 
+        "Software Engineer", "DevOps Engineer", "AI Researcher", 
+        "Technical Support Engineer", "Full Stack Developer", "Business Analyst",
+        "Software Development Intern", "Data Analytics Intern", "IT Support Intern", "Marketing Intern"
+    ],
+    "Employment Type": ["Full-time", "Contract", "Internship"],
+    "Industry": [
+        "Information Technology", "Finance", "Healthcare", "Education", "Retail",
+        "Telecommunications", "E-commerce", "Manufacturing", "Government", "Consulting"
+    ],
+    "Location": ["Mumbai", "Bangalore", "Chennai", "Delhi", "Hyderabad", "Pune"],
+    "Remote Work": ["Yes", "No"],
+}
+
+# Inclusive (min, max) accepted by the app for each numeric feature
+feature_ranges = {
+    "Age": (18, 65),
+    "Experience": (0, 25),
+    "Weekly Hours": (20, 60),
+    "Certifications": (0, 10),
+}
+
+# Preprocessing modes: the pickled ColumnTransformer itself, or the fast path built from it
+preprocessing_modes = ["sklearn", "dense", "csr"]
+
+# Load the pickled model and preprocessor
+def load_artifacts(model_file=model_path, preprocessor_file=preprocessor_path, preprocessing="sklearn"):
+    import joblib
+    from fast_preprocessor import FastPreprocessor
+    
+    if model_file.endswith(".bin"):
+        # Flat export from forest_export.py, memory-mapped instead of unpickled
+        from forest_export import FlatForest
+        model = FlatForest.load(model_file)
+    else:
+        model = joblib.load(model_file)
+    preprocessor = joblib.load(preprocessor_file)
+    if preprocessing != "sklearn":
+        # Same columns as the ColumnTransformer, so predictions are identical
+        preprocessor = FastPreprocessor.from_column_transformer(preprocessor, output=preprocessing)
+    return model, preprocessor
+
+# Predict salaries (in lakhs) for every row of a DataFrame with the model features
+def predict_frame(model, preprocessor, df):
+    X_transformed = preprocessor.transform(df[feature_columns])
+    return model.predict(X_transformed)
+
+# Identity of the artifact files on disk; it changes whenever one of them is rewritten
+def artifact_version(*paths):
+    version = []
+    for path in paths:
+        stat = os.stat(path)
+        version.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(version)
+
+# Content hash of the artifact files; unlike artifact_version it survives copies and only changes with the contents
+def artifact_hash(*paths, block_size=1 << 20):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+# Bounded LRU cache of predictions keyed on the normalized 11-field profile, safe to share between
+# threads (Streamlit sessions). It belongs to one artifact version and empties itself when that changes.
+class PredictionCache:
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+    
+    # Same profile, same key: whole numbers as int and option strings without stray whitespace
+    @staticmethod
+    def key(profile):
+        return tuple(int(profile[column]) if column in feature_ranges else str(profile[column]).strip()
+                     for column in feature_columns)
+    
+    # Drop every entry if the artifacts changed since the cache was filled
+    def check_version(self, version):
+        with self.lock:
+            if version != self.version:
+                self.entries.clear()
+                self.version = version
+    
+    def get(self, profile):
+        key = self.key(profile)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+    
+    # Look up without touching the counters or the recency order
+    def peek(self, profile):
+        with self.lock:
+            return self.entries.get(self.key(profile))
+    
+    def put(self, profile, value):
+        key = self.key(profile)
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+    
+    # Cached value, or compute(profile) stored for next time
+    def get_or_compute(self, profile, compute):
+        value = self.get(profile)
+        if value is None:
+            value = compute(profile)
+            self.put(profile, value)
+        return value
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+# Youngest age at which each education level is usually completed
+min_graduation_age = {"High School": 18, "Bachelor's": 21, "Master's": 23, "PhD": 28}
+
+# Profile validation rules shared by the app and the scoring tools
+def validate_inputs(age, experience, education, job_title, employment_type):
+    errors = []
+    
+    # Age-experience validation
+    min_age_for_exp = min_graduation_age[education] + experience
+    
+    if age < min_age_for_exp:
+        errors.append(f"Age ({age}) is too low for {experience} years of experience with {education} education. Minimum age should be {min_age_for_exp}")
+    
+    # Education-job validation
+    if job_title == "AI Researcher" and education not in ["Master's", "PhD"]:
+        errors.append("AI Researcher typically requires Master's or PhD education")
+    
+    if job_title in ["Machine Learning Engineer", "Data Scientist"] and education == "High School":
+        errors.append(f"{job_title} typically requires at least Bachelor's degree")
+    
+    # Experience validation for senior roles
+    if "Senior" in job_title and experience < 3:
+        errors.append("Senior positions typically require at least 3 years of experience")
+    
+    if "Architect" in job_title and experience < 5:
+        errors.append("Architect positions typically require at least 5 years of experience")
+    
+    # Internship validation
+    if employment_type == "Internship" and experience > 2:
+        errors.append("Internships are typically for candidates with 0-2 years of experience")
+    
+    return errors
+
+# Bit flags returned by validate_frame, one per validate_inputs rule plus a schema check
+validation_codes = {
+    "age_too_low": 1,
+    "ai_researcher_education": 2,
+    "degree_required": 4,
+    "senior_experience": 8,
+    "architect_experience": 16,
+    "internship_experience": 32,
+    "invalid_value": 64,  # Missing value, unknown option or number outside feature_ranges
+}
+
+# validate_inputs for a whole frame: the same rules as boolean masks over the columns, returned as
+# one uint8 code per row (0 = valid, otherwise the OR of validation_codes)
+def validate_frame(df):
+    import numpy as np
+    import pandas as pd
+    
+    # String rules are evaluated once per distinct value, then spread to the rows by code;
+    # each column is factorized once (categorical columns already carry their codes)
+    factorized = {}
+    def per_value(column, rule):
+        if column not in factorized:
+            series = df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                factorized[column] = series.cat.codes.to_numpy(), series.cat.categories
+            else:
+                factorized[column] = pd.factorize(series)
+        codes, values = factorized[column]
+        result = np.array([rule(value) for value in values], dtype=bool)
+        return np.append(result, False)[codes]  # code -1 (missing) takes the trailing False
+    
+    def numbers(column):
+        return pd.to_numeric(df[column], errors="coerce").to_numpy()
+    
+    age, experience = numbers("Age"), numbers("Experience")
+    codes = np.zeros(len(df), dtype=np.uint8)
+    
+    def flag(mask, name):
+        # The masks are bool arrays, so their bytes are 0/1 and multiply into the flag bit
+        codes[...] |= mask.view(np.uint8) * np.uint8(validation_codes[name])
+    
+    invalid = np.zeros(len(df), dtype=bool)
+    for column, (low, high) in feature_ranges.items():
+        values = numbers(column)
+        invalid |= ~((values >= low) & (values <= high))  # NaN fails both comparisons
+        if values.dtype.kind == "f":
+            invalid |= values != np.floor(values)
+    for column, options in feature_options.items():
+        invalid |= ~per_value(column, lambda value: value in options)
+    flag(invalid, "invalid_value")
+    
+    education_codes, education_values = factorized["Education"]
+    min_age = np.append([min_graduation_age.get(value, np.nan) for value in education_values], np.nan)[education_codes]
+    rules = {
+        "age_too_low": age < min_age + experience,
+        "ai_researcher_education": (per_value("Job Title", lambda value: value == "AI Researcher")
+                                    & ~per_value("Education", lambda value: value in ["Master's", "PhD"])),
+        "degree_required": (per_value("Job Title",
+                                      lambda value: value in ["Machine Learning Engineer", "Data Scientist"])
+                            & per_value("Education", lambda value: value == "High School")),
+        "senior_experience": per_value("Job Title", lambda value: "Senior" in str(value)) & (experience < 3),
+        "architect_experience": per_value("Job Title", lambda value: "Architect" in str(value)) & (experience < 5),
+        "internship_experience": per_value("Employment Type", lambda value: value == "Internship") & (experience > 2),
+    }
+    for name, mask in rules.items():
+        flag(mask, name)
+    return codes
+
+# Names of the validation_codes set in one row's code
+def describe_validation_code(code):
+    return [name for name, flag in validation_codes.items() if code & flag]
+
+# Check a profile dict (e.g. from JSON) against the app's schema and rules
+# Returns the normalized feature row and a list of errors
+def parse_profile(payload):
+    if not isinstance(payload, dict):
+        return None, ["Profile must be a JSON object"]
+    
+    missing = [column for column in feature_columns if column not in payload]
+    if missing:
+        return None, [f"Missing fields: {', '.join(missing)}"]
+    
+    row = {}
+    errors = []
+    for column in feature_columns:
+        value = payload[column]
+        if column in feature_ranges:
+            low, high = feature_ranges[column]
+            if (isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value)
+                    or int(value) != value):
+                errors.append(f"{column} must be a whole number")
+                continue
+            value = int(value)
+            if not low <= value <= high:
+                errors.append(f"{column} must be between {low} and {high}")
+        elif value not in feature_options[column]:
+            errors.append(f"{column} must be one of: {', '.join(feature_options[column])}")
+        row[column] = value
+    
+    if errors:
+        return None, errors
+    
+    errors = validate_inputs(row["Age"], row["Experience"], row["Education"],
+                             row["Job Title"], row["Employment Type"])
+    return (None if errors else row), errors
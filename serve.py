@@ -0,0 +1,220 @@
+# HTTP scoring service with micro-batching
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from metrics import InferenceMetrics, SamplingProfiler
+from predictor import (load_artifacts, parse_profile, feature_columns, model_path, preprocessor_path,
+                       preprocessing_modes)
+
+# Groups rows from concurrent requests into one transform + predict call
+class MicroBatcher:
+    def __init__(self, model, preprocessor, max_batch_size=256, max_wait=0.005, metrics=None):
+        self.model = model
+        self.preprocessor = preprocessor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.metrics = metrics or InferenceMetrics()
+        self.requests = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    # Queue rows for the next batch; the returned future resolves to their predictions
+    def submit(self, rows):
+        future = Future()
+        self.requests.put((rows, future))
+        return future
+
+    def _collect(self):
+        batch = [self.requests.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self.requests.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            rows = [row for request_rows, _ in batch for row in request_rows]
+            self.metrics.observe_batch(len(rows))
+            try:
+                with self.metrics.time("dataframe"):
+                    df = pd.DataFrame(rows, columns=feature_columns)
+                with self.metrics.time("transform"):
+                    X = self.preprocessor.transform(df)
+                with self.metrics.time("predict"):
+                    predictions = self.model.predict(X)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for request_rows, future in batch:
+                future.set_result(predictions[start:start + len(request_rows)].tolist())
+                start += len(request_rows)
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # The default backlog of 5 resets connections under load
+
+def make_handler(batcher, timeout=30.0, profiler=None):
+    profiler = profiler or SamplingProfiler()
+    profile_lock = threading.Lock()  # One recording at a time
+    
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_text(self, body, content_type="text/plain; charset=utf-8"):
+            data = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        # GET /health, GET /metrics (Prometheus text format), GET /profile?seconds=N (sampled
+        # collapsed stacks of the server's threads over the next N seconds)
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif url.path == "/metrics":
+                self._send_text(batcher.metrics.render(), "text/plain; version=0.0.4")
+            elif url.path == "/profile":
+                try:
+                    seconds = float(parse_qs(url.query).get("seconds", ["5"])[0])
+                except ValueError:
+                    seconds = math.nan
+                if not math.isfinite(seconds) or seconds <= 0:
+                    self._send_json(400, {"error": "seconds must be a positive number"})
+                    return
+                if not profile_lock.acquire(blocking=False):
+                    self._send_json(409, {"error": "A profile is already being recorded"})
+                    return
+                try:
+                    profiler.reset()
+                    profiler.start()
+                    time.sleep(min(seconds, 60.0))
+                finally:
+                    profiler.stop()
+                    profile_lock.release()
+                self._send_text(profiler.collapsed() + "\n")
+            else:
+                self._send_json(404, {"error": "Not found"})
+
+        # Request body, or None when Content-Length is not a non-negative integer. The connection is then
+        # closed, since the unread body would otherwise be parsed as the next keep-alive request.
+        def _read_body(self):
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                self.close_connection = True
+                return None
+            return self.rfile.read(length)
+
+        # POST /predict with one profile object, or a list of profiles
+        def do_POST(self):
+            body = self._read_body()
+            if body is None:
+                self._send_json(400, {"error": "Invalid Content-Length"})
+            elif self.path != "/predict":
+                self._send_json(404, {"error": "Not found"})
+            else:
+                with batcher.metrics.time("request"):
+                    self._predict(body)
+
+        def _predict(self, body):
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self._send_json(400, {"error": "Request body must be JSON"})
+                return
+
+            profiles = payload if isinstance(payload, list) else [payload]
+            rows, errors = [], {}
+            for index, profile in enumerate(profiles):
+                row, row_errors = parse_profile(profile)
+                if row_errors:
+                    errors[index] = row_errors
+                rows.append(row)
+            if errors:
+                self._send_json(400, {"errors": errors})
+                return
+            if not rows:
+                self._send_json(200, {"salaries": []})
+                return
+
+            try:
+                salaries = batcher.submit(rows).result(timeout=timeout)
+            except Exception as e:
+                self._send_json(500, {"error": f"Error making prediction: {e}"})
+                return
+
+            if isinstance(payload, list):
+                self._send_json(200, {"salaries": salaries})
+            else:
+                self._send_json(200, {"salary": salaries[0]})
+
+        def log_message(self, format, *args):
+            pass  # Keep the hot path quiet
+
+    return ScoringHandler
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve salary predictions over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=256, help="most rows scored in one call")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0,
+                        help="how long the first request in a batch waits for others to join")
+    parser.add_argument("--model", default=model_path, help="pickled model")
+    parser.add_argument("--preprocessor", default=preprocessor_path, help="pickled preprocessor")
+    parser.add_argument("--preprocessing", choices=preprocessing_modes, default="csr",
+                        help="'sklearn' runs the pickled ColumnTransformer, 'dense'/'csr' the equivalent fast path")
+    parser.add_argument("--profile-interval-ms", type=float, default=5.0,
+                        help="sampling interval of the profiler behind GET /profile?seconds=N")
+    args = parser.parse_args()
+
+    model, preprocessor = load_artifacts(args.model, args.preprocessor, args.preprocessing)
+    batcher = MicroBatcher(model, preprocessor, args.max_batch_size, args.max_wait_ms / 1000)
+    server = ScoringServer((args.host, args.port),
+                           make_handler(batcher, profiler=SamplingProfiler(args.profile_interval_ms / 1000)))
+    print(f"Serving salary predictions on http://{args.host}:{args.port}/predict (metrics on /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
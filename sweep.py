@@ -0,0 +1,71 @@
+# What-if sweeps: one base profile expanded over one or two features, scored in a single batch
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from predictor import (load_artifacts, predict_frame, validate_frame, feature_columns, feature_options, feature_ranges,
+                       model_path, preprocessor_path)
+
+# Every value the app offers for a feature
+def sweep_values(feature):
+    if feature in feature_ranges:
+        low, high = feature_ranges[feature]
+        return list(range(low, high + 1))
+    return list(feature_options[feature])
+
+# Grid of profiles: the base profile repeated for every combination of the swept values.
+# The first feature varies fastest, so the predictions reshape to (len(values[1]), len(values[0])).
+def expand_grid(profile, features, values=None):
+    values = values or [sweep_values(feature) for feature in features]
+    size = int(np.prod([len(feature_values) for feature_values in values]))
+    grid = {column: np.repeat(np.array([profile[column]], dtype=object), size) for column in feature_columns}
+
+    repeat = 1
+    for feature, feature_values in zip(features, values):
+        column = np.repeat(np.array(feature_values, dtype=object), repeat)
+        grid[feature] = np.tile(column, size // len(column))
+        repeat *= len(feature_values)
+
+    df = pd.DataFrame(grid)
+    for column in feature_ranges:
+        df[column] = df[column].astype(np.int64)
+    return df
+
+# Predicted salary over the grid, shape (len(values[0]),) for one feature or (len(values[1]), len(values[0]))
+# for two, plus the validate_frame codes of the same shape (rows the app's rules would reject are non-zero)
+def sweep(model, preprocessor, profile, features, values=None):
+    values = values or [sweep_values(feature) for feature in features]
+    grid = expand_grid(profile, features, values)
+    shape = [len(feature_values) for feature_values in reversed(values)]
+    predictions = predict_frame(model, preprocessor, grid).reshape(shape)
+    return values, predictions, validate_frame(grid).reshape(shape)
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict salaries over a grid of one or two features")
+    parser.add_argument("profile", help="JSON object with the 11 model features")
+    parser.add_argument("features", nargs="+", help="one or two features to sweep over all their values")
+    parser.add_argument("--model", default=model_path, help="pickled model")
+    parser.add_argument("--preprocessor", default=preprocessor_path, help="pickled preprocessor")
+    args = parser.parse_args()
+    if len(args.features) > 2:
+        parser.error("sweep at most two features")
+
+    model, preprocessor = load_artifacts(args.model, args.preprocessor, "csr")
+    start = time.perf_counter()
+    values, predictions, codes = sweep(model, preprocessor, json.loads(args.profile), args.features)
+    elapsed = time.perf_counter() - start
+
+    if len(args.features) == 1:
+        table = pd.DataFrame({args.features[0]: values[0], "Predicted Salary": predictions.round(2)})
+    else:
+        table = pd.DataFrame(predictions.round(2), index=pd.Index(values[1], name=args.features[1]),
+                             columns=pd.Index(values[0], name=args.features[0]))
+    print(table.to_string())
+    print(f"\n{predictions.size} profiles scored in {elapsed * 1000:.1f} ms "
+          f"({int(np.count_nonzero(codes))} break the app's validation rules)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# Scripted training pipeline: preprocessing, cross-validation, grid search and model export
+import argparse
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold, ParameterGrid, train_test_split
+from sklearn.preprocessing import OneHotEncoder
+
+from ingest import cache_dir, ingest, schemas
+from predictor import feature_columns, model_path, preprocessor_path
+
+categorical_features = ["Gender", "Education", "Job Title", "Employment Type", "Industry", "Location", "Remote Work"]
+
+# Same search space as the notebook's GridSearchCV
+param_grid = {
+    'n_estimators': [50, 100, 150],
+    'max_depth': [None, 10, 20],
+    'min_samples_split': [2, 5]
+}
+
+# The notebook's ColumnTransformer, so the app can load the result unchanged
+def build_preprocessor():
+    onehot = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
+    return ColumnTransformer(transformers=[("onehot", onehot, categorical_features)], remainder="passthrough")
+
+# Only the model features and the target are read, with categorical and int8 columns. The file is
+# mapped onto the canonical schema first (see ingest.py); normalized CSVs are cached by file hash.
+# The app always sends all 11 features, so rows from sources that lack some of them are skipped.
+def load_dataset(path, schema=None, cache=cache_dir):
+    df = ingest(path, schema, cache)
+    complete = df[feature_columns].notna().all(axis=1)
+    if not complete.any():
+        raise ValueError(f"{path} has no rows with all {len(feature_columns)} model features")
+    if not complete.all():
+        print(f"Skipping {int((~complete).sum())} rows with missing features")
+        df = df[complete].reset_index(drop=True)
+    return df[feature_columns], df["Salary"].to_numpy(dtype=np.float64)
+
+# Save an array once and reopen it read-only memory-mapped, so worker processes share the pages
+def share_array(array, folder, name):
+    path = os.path.join(folder, f"{name}.npy")
+    np.save(path, array)
+    return np.load(path, mmap_mode="r")
+
+# One (config, fold) task, fitted single-threaded in a worker process
+def fit_and_score(params, X, y, train_index, test_index, seed):
+    model = RandomForestRegressor(**params, random_state=seed, n_jobs=1)
+    model.fit(X[train_index], y[train_index])
+    return r2_score(y[test_index], model.predict(X[test_index]))
+
+# Score every config on every fold as independent tasks; returns an R2 array of shape (configs, folds)
+# `rows` restricts the folds to a subset of the (shared) training rows
+def cross_validate(configs, X, y, cv, seed, n_jobs, rows=None):
+    if rows is None:
+        rows = np.arange(len(y))
+    folds = [(rows[train_index], rows[test_index]) for train_index, test_index in KFold(n_splits=cv).split(rows)]
+    scores = Parallel(n_jobs=n_jobs, max_nbytes=None)(
+        delayed(fit_and_score)(params, X, y, train_index, test_index, seed)
+        for params in configs for train_index, test_index in folds)
+    return np.array(scores).reshape(len(configs), len(folds))
+
+# Full grid search; returns the best config and its mean CV R2
+def grid_search(configs, X, y, cv, seed, n_jobs):
+    scores = cross_validate(configs, X, y, cv, seed, n_jobs).mean(axis=1)
+    return configs[int(np.argmax(scores))], scores.max()
+
+# Successive halving: score all configs on a small random subset of rows, keep the best 1/factor,
+# and repeat on factor times more rows until the last round uses the whole training set
+def halving_search(configs, X, y, cv, seed, n_jobs, factor=3):
+    if factor < 2:
+        raise ValueError(f"halving factor must be at least 2, got {factor}")
+    n_rounds = 1 + int(np.floor(np.log(len(configs)) / np.log(factor)))
+    order = np.random.default_rng(seed).permutation(len(y))
+    candidates = list(configs)
+    row_fits = 0
+
+    for round_index in range(n_rounds):
+        n_rows = len(y) if round_index == n_rounds - 1 else max(len(y) // factor ** (n_rounds - 1 - round_index), cv * 10)
+        scores = cross_validate(candidates, X, y, cv, seed, n_jobs, rows=np.sort(order[:n_rows])).mean(axis=1)
+        row_fits += len(candidates) * cv * n_rows
+        print(f"  round {round_index + 1}/{n_rounds}: {len(candidates)} configs on {n_rows} rows, "
+              f"best R2 {scores.max():.4f}")
+
+        ranking = np.argsort(scores)[::-1]
+        if round_index == n_rounds - 1:
+            return candidates[ranking[0]], scores.max(), row_fits
+        candidates = [candidates[i] for i in ranking[:max(1, -(-len(candidates) // factor))]]
+
+def save_artifacts(model, preprocessor, model_file, preprocessor_file):
+    for path in (model_file, preprocessor_file):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    joblib.dump(model, model_file)
+    joblib.dump(preprocessor, preprocessor_file)
+    print(f"Model saved to '{model_file}', preprocessor saved to '{preprocessor_file}'")
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the salary model and export the app's artifacts")
+    parser.add_argument("--data", default="data/realistic_employee_dataset.csv",
+                        help="training dataset: CSV, Parquet or a directory of generated part files")
+    parser.add_argument("--schema", choices=list(schemas), default=None,
+                        help="layout of --data (default: detected from the header)")
+    parser.add_argument("--no-cache", action="store_true", help="re-parse --data instead of using the ingest cache")
+    parser.add_argument("--jobs", type=int, default=-1, help="worker processes (-1 = all cores)")
+    parser.add_argument("--cv", type=int, default=5, help="folds for the baseline cross-validation")
+    parser.add_argument("--search-cv", type=int, default=3, help="folds for the grid search")
+    parser.add_argument("--search", choices=["grid", "halving", "none"], default="grid",
+                        help="'grid' tries every config on all rows, 'halving' drops losers early on growing subsets")
+    parser.add_argument("--halving-factor", type=int, default=3, help="each halving round keeps the best 1/N of the configs on N times more rows (N >= 2)")
+    parser.add_argument("--compare-grid", action="store_true",
+                        help="with --search halving, also run the full grid and report the time saved")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="stream the data in chunks and fit a log-linear model, for files larger than memory")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="rows per chunk with --out-of-core")
+    parser.add_argument("--model-output", default=model_path)
+    parser.add_argument("--preprocessor-output", default=preprocessor_path)
+    args = parser.parse_args()
+    if args.halving_factor < 2:
+        parser.error("--halving-factor must be at least 2")
+
+    start = time.perf_counter()
+    if args.out_of_core:
+        from out_of_core import train_out_of_core
+        model, preprocessor, _ = train_out_of_core(args.data, args.chunk_size, args.test_size, schema=args.schema)
+        save_artifacts(model, preprocessor, args.model_output, args.preprocessor_output)
+        print(f"Total time: {time.perf_counter() - start:.2f}s")
+        return
+
+    X, y = load_dataset(args.data, args.schema, None if args.no_cache else cache_dir)
+
+    preprocessor = build_preprocessor()
+    transformed_X = preprocessor.fit_transform(X).astype(np.float32)  # The forest works in float32 anyway
+    print(f"Loaded and transformed {len(X)} rows in {time.perf_counter() - start:.2f}s")
+
+    train_index, test_index = train_test_split(np.arange(len(y)), test_size=args.test_size, random_state=args.seed)
+
+    with tempfile.TemporaryDirectory() as folder:
+        x_train = share_array(transformed_X[train_index], folder, "x_train")
+        y_train = share_array(y[train_index], folder, "y_train")
+
+        # cross_validation of the default forest
+        step = time.perf_counter()
+        cv_score = cross_validate([{}], x_train, y_train, args.cv, args.seed, args.jobs)[0]
+        print(f"Cross-Validation R2 Scores : {cv_score}")
+        print(f"Mean Cross-Validation R2: {cv_score.mean()} ({time.perf_counter() - step:.2f}s)")
+
+        best_params = {}
+        configs = list(ParameterGrid(param_grid))
+        grid_row_fits = len(configs) * args.search_cv * len(y_train)
+        if args.search == "halving":
+            step = time.perf_counter()
+            best_params, best_score, row_fits = halving_search(configs, x_train, y_train, args.search_cv,
+                                                               args.seed, args.jobs, args.halving_factor)
+            halving_time = time.perf_counter() - step
+            print(f"Best Parameters: {best_params}")
+            print(f"Best CV R² Score: {best_score} ({len(configs)} configs in {halving_time:.2f}s, "
+                  f"{row_fits / grid_row_fits:.0%} of the full grid's training rows)")
+
+            if args.compare_grid:
+                step = time.perf_counter()
+                grid_params, grid_score = grid_search(configs, x_train, y_train, args.search_cv, args.seed, args.jobs)
+                grid_time = time.perf_counter() - step
+                print(f"Full grid: {grid_params}, CV R² {grid_score} in {grid_time:.2f}s "
+                      f"-> halving saved {grid_time - halving_time:.2f}s ({1 - halving_time / grid_time:.0%})")
+                for name, params in (("halving", best_params), ("grid", grid_params)):
+                    candidate = RandomForestRegressor(**params, random_state=args.seed, n_jobs=args.jobs)
+                    candidate.fit(x_train, y_train)
+                    print(f"  {name} choice test R2: {candidate.score(transformed_X[test_index], y[test_index]):.4f}")
+        elif args.search == "grid":
+            step = time.perf_counter()
+            best_params, best_score = grid_search(configs, x_train, y_train, args.search_cv, args.seed, args.jobs)
+            print(f"Best Parameters: {best_params}")
+            print(f"Best CV R² Score: {best_score} ({len(configs)} configs in {time.perf_counter() - step:.2f}s)")
+
+        model = RandomForestRegressor(**best_params, random_state=args.seed, n_jobs=args.jobs)
+        model.fit(x_train, y_train)
+    model.n_jobs = None  # Single-row predictions in the app are faster without a thread pool
+
+    print(f"Test set R2: {model.score(transformed_X[test_index], y[test_index]):.2f}")
+
+    save_artifacts(model, preprocessor, args.model_output, args.preprocessor_output)
+    print(f"Total time: {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()